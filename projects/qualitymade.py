@@ -10,6 +10,7 @@ from karon.tree.build import generate_tree
 from karon.tree.util import get, put
 # from karon.operational import as_opnode
 from karon.io.pandas import to_dataframe
+from karon.schema import Schema
 
 def log(msg):
     print(msg)
@@ -27,6 +28,8 @@ ifiles = {
 output_prefix = 'qualitymade'
 # output_prefix = 'characterization'
 # output_prefix = 'build'
+# attribute names, shared by the reader and the derived statistics
+schema = Schema()
 
 log(f"Building {output_prefix} relationships from "
     f"({', '.join(list(ifiles.values()))})")
@@ -261,9 +264,14 @@ def flatten(key):
 class ArrayOnly:
     """
     Base class to ensure calculations are performed only on Real Arrays.
+    The result is stored under the name derived from `key` by `template`,
+    which is built once per key rather than once per node.
     """
+    template = "{}"
+
     def __init__(self, key):
         self.key = key
+        self.name = schema.derived(type(self).template, key)
 
     def __call__(self, node):
         arr = node.contents.get(self.key, None)
@@ -282,34 +290,22 @@ class ArrayOnly:
 
 class Maximum(ArrayOnly):
     function = np.nanmax
-
-    def __init__(self, key):
-        super().__init__(key)
-        self.name = f"max {key}"
+    template = "max {}"
 
 
 class Minimum(ArrayOnly):
     function = np.nanmin
-
-    def __init__(self, key):
-        super().__init__(key)
-        self.name = f"min {key}"
+    template = "min {}"
 
 
 class Mean(ArrayOnly):
     function = np.nanmean
-
-    def __init__(self, key):
-        super().__init__(key)
-        self.name = f"mean {key}"
+    template = "mean {}"
 
 
 class StdDev(ArrayOnly):
     function = np.nanstd
-
-    def __init__(self, key):
-        super().__init__(key)
-        self.name = f"std {key}"
+    template = "std {}"
 
 
 class RemeltRatio:
@@ -415,7 +411,7 @@ def get_attributes(root, exclude=("Sample Name", "Parent Sample Name")):
 # Creates a reader that stores records according to the Node generating
 # function "generic" (readwrite, requires "Sample Name" and
 # "Parent Sample Name"
-reader = ExcelIO(default=generic)
+reader = ExcelIO(default=generic, schema=schema)
 
 log("Generated reader.")
 
@@ -1,12 +1,19 @@
 # -*- coding: utf-8 -*-
-from pkg_resources import get_distribution, DistributionNotFound
-
-try:
-    # Change here if project is renamed and does not equal the package name
-    dist_name = __name__
-    __version__ = get_distribution(dist_name).version
-except DistributionNotFound:
-    __version__ = 'unknown'
-
 from .sample import Sample
 from karon.exceptions import RequirementError
+
+
+def __getattr__(name):
+    # The version is looked up on first use: querying the installed
+    # distributions is slow, and most users of karon never ask for it.
+    if name == '__version__':
+        from importlib.metadata import version, PackageNotFoundError
+        try:
+            # Change here if project is renamed and does not equal the
+            # package name
+            value = version(__name__)
+        except PackageNotFoundError:
+            value = 'unknown'
+        globals()['__version__'] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,257 @@
+__all__ = ["ColumnStore", "Row"]
+
+
+import numpy as np
+from collections.abc import MutableMapping
+
+
+def _is_float(value):
+    return isinstance(value, (float, np.floating))
+
+
+class ColumnStore(object):
+    def __init__(self, capacity: int = 1024):
+        """
+        Columnar backend for the contents of many samples, e.g. all the
+        samples in a forest. Each attribute is stored once, as a column
+        holding one value per sample--a float64 array while every value is
+        a float, an object array otherwise--and a validity mask that marks
+        which samples have the attribute. Each sample's contents become a
+        `Row`, a mapping view into the table, so code that reads and
+        writes `node.contents` keeps working, while whole columns are
+        available to vectorized operations through `column`.
+
+        Example:
+
+            store = ColumnStore()
+            store.adopt(nodes)
+            values, valid = store.column('Hv (HV)')
+            mean = np.mean(values[valid])
+
+        :param capacity, int: Initial number of rows allocated.
+        """
+        self._capacity = max(1, int(capacity))
+        self._size = 0
+        self._columns = {}
+        self._dirty = {}
+
+    @classmethod
+    def from_columns(cls, columns, size):
+        """
+        Creates a table from whole columns, e.g. read from a columnar file,
+        without copying them. The arrays are owned by the table from then
+        on and must be writeable.
+
+        :param columns: Values and validity mask of each attribute. A
+            values array is float64 or object, a mask is boolean, and both
+            hold `size` entries.
+        :type columns: dict of key: (numpy.ndarray, numpy.ndarray)
+        :param size, int: Number of rows.
+        :return: ColumnStore
+        """
+        store = cls(capacity=size)
+        store._size = size
+        for key, (values, valid) in iter(columns.items()):
+            if values.dtype != float:
+                values = values.astype(object, copy=False)
+            if len(values) != size or len(valid) != size:
+                raise ValueError(f"Column {key} does not have {size} rows.")
+            if size == 0:
+                # the capacity is at least one row
+                values = np.empty(1, dtype=values.dtype)
+                valid = np.zeros(1, dtype=bool)
+            store._columns[key] = (values, np.asarray(valid, dtype=bool))
+        return store
+
+    def rows(self):
+        """
+        Returns a view of each row of the table.
+
+        :rtype: list of Row
+        """
+        return [Row(self, i) for i in range(self._size)]
+
+    def __len__(self):
+        return self._size
+
+    def keys(self):
+        return list(self._columns.keys())
+
+    def _grow(self, size):
+        if size <= self._capacity:
+            return
+        capacity = self._capacity
+        while capacity < size:
+            capacity *= 2
+        for key, (values, valid) in iter(self._columns.items()):
+            grown = np.empty(capacity, dtype=values.dtype)
+            grown[:self._capacity] = values
+            mask = np.zeros(capacity, dtype=bool)
+            mask[:self._capacity] = valid
+            self._columns[key] = (grown, mask)
+        self._capacity = capacity
+
+    def _set(self, row, key, value):
+        try:
+            values, valid = self._columns[key]
+        except KeyError:
+            dtype = float if _is_float(value) else object
+            values = np.empty(self._capacity, dtype=dtype)
+            valid = np.zeros(self._capacity, dtype=bool)
+            self._columns[key] = (values, valid)
+        if values.dtype != object and not _is_float(value):
+            values = values.astype(object)
+            self._columns[key] = (values, valid)
+        values[row] = value
+        valid[row] = True
+        self._dirty.setdefault(row, set()).add(key)
+
+    def _get(self, row, key):
+        values, valid = self._columns[key]
+        if not valid[row]:
+            raise KeyError(key)
+        return values[row]
+
+    def _delete(self, row, key):
+        values, valid = self._columns[key]
+        if not valid[row]:
+            raise KeyError(key)
+        valid[row] = False
+        if values.dtype == object:
+            values[row] = None
+        self._dirty.setdefault(row, set()).add(key)
+
+    def _keys(self, row):
+        return [k for k, (_, valid) in iter(self._columns.items())
+                if valid[row]]
+
+    def append(self, contents=None):
+        """
+        Adds a row to the table.
+
+        :param contents: (optional) Initial contents of the row.
+        :type contents: dict-like
+        :return: View of the new row.
+        :rtype: Row
+        """
+        row = self._size
+        self._grow(row + 1)
+        self._size += 1
+        for k, v in iter(dict(contents or {}).items()):
+            self._set(row, k, v)
+        return Row(self, row)
+
+    def column(self, key):
+        """
+        Returns the values and validity mask of a column, one entry for
+        each row. These are views, not copies.
+
+        :param key: Attribute name.
+        :return: (values, valid)
+        :rtype: tuple of numpy.ndarray
+        """
+        values, valid = self._columns[key]
+        return values[:self._size], valid[:self._size]
+
+    def adopt(self, nodes):
+        """
+        Moves the contents of each node into the table and replaces them
+        with a view of the node's row. Changed keys (see `Sample.dirty`)
+        are preserved.
+
+        :param nodes: Nodes whose contents are dict-like.
+        :type nodes: iterable of Nodes
+        :return: None
+        """
+        for node in nodes:
+            dirty = node.dirty() if hasattr(node, 'dirty') else set()
+            row = self.append(node.contents)
+            node.contents = row
+            row.clean()
+            if dirty:
+                self._dirty[row.index] = set(dirty)
+
+    def sample(self, **attributes):
+        """
+        Creates a Sample whose contents are a new row in the table.
+
+        :param attributes: As for `Sample`.
+        :return: Sample
+        """
+        from .sample import Sample
+        readable = attributes.pop('readable', True)
+        writeable = attributes.pop('writeable', True)
+        node = Sample(readable=readable, writeable=writeable)
+        node.contents = self.append(attributes)
+        return node
+
+
+class Row(MutableMapping):
+    __slots__ = ('_store', '_index')
+
+    def __init__(self, store, index):
+        """
+        Mapping view of a single row of a `ColumnStore`. Like
+        `karon.sample.Contents`, it records the keys that changed since
+        it was last marked clean.
+
+        :param store: Table that holds the values.
+        :type store: ColumnStore
+        :param index, int: Row in the table.
+        """
+        self._store = store
+        self._index = index
+
+    @property
+    def index(self):
+        return self._index
+
+    @property
+    def store(self):
+        return self._store
+
+    def __getitem__(self, key):
+        try:
+            return self._store._get(self._index, key)
+        except KeyError:
+            raise KeyError(key)
+
+    def get(self, key, default=None):
+        try:
+            return self._store._get(self._index, key)
+        except KeyError:
+            return default
+
+    def __contains__(self, key):
+        try:
+            return bool(self._store._columns[key][1][self._index])
+        except KeyError:
+            return False
+
+    def __setitem__(self, key, value):
+        self._store._set(self._index, key, value)
+
+    def __delitem__(self, key):
+        self._store._delete(self._index, key)
+
+    def __iter__(self):
+        return iter(self._store._keys(self._index))
+
+    def __len__(self):
+        return len(self._store._keys(self._index))
+
+    def __repr__(self):
+        return f"Row({dict(self)!r})"
+
+    def copy(self):
+        return dict(self)
+
+    @property
+    def dirty(self):
+        return self._store._dirty.setdefault(self._index, set())
+
+    def clean(self, keys=None):
+        if keys is not None:
+            self.dirty.difference_update(keys)
+        if keys is None or not self.dirty:
+            self._store._dirty.pop(self._index, None)
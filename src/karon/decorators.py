@@ -1,4 +1,5 @@
 from karon.exceptions import RequirementError
+from collections import Counter
 from functools import wraps
 # from uuid import uuid4 as uuid
 # import petname
@@ -9,80 +10,209 @@ import warnings
 # uid = lambda: str(uuid())
 
 
-def expects(*keys, **defaults):
-    keys = keys + tuple(defaults.keys())
-    def wrapper(proc):
-        @wraps(proc)
+class Spec(object):
+    def __init__(self, proc, defaults=None, checks=()):
+        """
+        Describes a node generator built by stacking the decorators in
+        this module: the undecorated function, the defaults merged from
+        every layer and the key checks that remain after those defaults
+        are applied. Stacked decorators use this to fuse their layers into
+        a single function, and readers use it to build many nodes at once
+        without passing each row through the generator.
+
+        :param proc: Undecorated generator function.
+        :param defaults: Defaults, in order of precedence, from all layers.
+        :type defaults: dict
+        :param checks: ('requires' or 'expects', key) pairs, outermost
+            layer first, for keys not provided by any default.
+        :type checks: list of tuples
+        """
+        self.proc = proc
+        self.defaults = dict(defaults or {})
+        self.checks = list(checks)
+        self.generator = None
+
+    @property
+    def name(self):
+        return self.proc.__name__
+
+    @property
+    def requires(self):
+        return tuple(k for kind, k in self.checks if kind == 'requires')
+
+    @property
+    def expects(self):
+        return tuple(k for kind, k in self.checks if kind == 'expects')
+
+    def layer(self, defaults=None, checks=()):
+        """
+        Returns the Spec of a new, outer layer with the given defaults
+        and checks around this one.
+        """
+        defaults = dict(defaults or {})
+        merged = dict(self.defaults)
+        merged.update(defaults)
+        checks = [(kind, k) for kind, k in list(checks) + self.checks
+                  if k not in defaults]
+        return Spec(self.proc, merged, checks)
+
+    def compile(self, wrapped):
+        """
+        Returns a single generator function that applies this Spec.
+
+        :param wrapped: Function the new generator replaces, i.e. the
+            function passed to the outermost decorator, from which the
+            name, docstring, etc. are copied.
+        :return: Generator, signature: `generator(**attributes) -> Node`
+        """
+        proc = self.proc
+        defaults = self.defaults
+        check = self.check if self.checks else None
+
+        @wraps(wrapped)
         def func(**attributes):
+            if check is not None:
+                check(attributes)
             kwds = dict(defaults)
             kwds.update(attributes)
-            for k in keys:
-                if k not in kwds:
-                    warnings.warn(f"{func.__name__} expects {k}", UserWarning)
             return proc(**kwds)
         return func
+
+    def check(self, keys, count: int = 1):
+        """
+        Applies the key checks to the keys provided by the caller--e.g.
+        the keyword arguments of a call or the columns of a sheet--in the
+        order the stacked decorators would have applied them. Raises a
+        RequirementError for a missing required key and warns for a
+        missing expected key, or, while a `MissingFieldReport` is active,
+        adds the missing expected key to the report.
+
+        :param keys: Keys provided by the caller.
+        :param count, int: Number of nodes these keys describe, e.g. the
+            number of rows in a sheet. Default: 1.
+        """
+        for kind, k in self.checks:
+            if k not in keys:
+                if kind == 'requires':
+                    raise RequirementError(f"{self.name} requires {k}")
+                if _reports:
+                    _reports[-1].add(self.name, k, count)
+                else:
+                    warnings.warn(f"{self.name} expects {k}", UserWarning)
+
+
+_reports = []
+
+
+class MissingFieldReport(object):
+    def __init__(self):
+        """
+        Collects missing expected fields (see `expects`), counted by
+        generator and key, instead of issuing a warning for each one.
+        Activate the report as a context manager; `warn` then issues a
+        single summary.
+
+        Example:
+
+            with MissingFieldReport() as report:
+                nodes = [vickers(**row) for row in rows]
+            report.warn()
+            report.counts[('vickers', 'Hv (HV)')]  # rows missing Hv (HV)
+        """
+        self.counts = Counter()
+
+    def __len__(self):
+        return len(self.counts)
+
+    def __enter__(self):
+        _reports.append(self)
+        return self
+
+    def __exit__(self, *exc):
+        _reports.remove(self)
+        return False
+
+    def add(self, name, key, count: int = 1):
+        self.counts[(name, key)] += count
+
+    def summary(self):
+        """
+        Returns a summary of the missing fields, one line per generator
+        and key.
+
+        :rtype: str
+        """
+        total = sum(self.counts.values())
+        lines = [f"{total} missing expected fields:"]
+        for (name, key), n in sorted(self.counts.items(),
+                                     key=lambda item: str(item[0])):
+            lines.append(f"  {name} expects {key}: missing {n} times")
+        return '\n'.join(lines)
+
+    def warn(self):
+        """
+        Issues a single UserWarning with the summary, if any field was
+        missing.
+        """
+        if self.counts:
+            warnings.warn(self.summary(), UserWarning)
+
+
+def get_spec(generator):
+    """
+    Returns the Spec of a node generator built from the decorators in this
+    module, or None if the generator is anything else, including a
+    function that wraps such a generator.
+    """
+    spec = getattr(generator, 'spec', None)
+    if isinstance(spec, Spec) and spec.generator is generator:
+        return spec
+    return None
+
+
+def _compose(proc, defaults=None, checks=()):
+    """
+    Adds a decorator layer--defaults and key checks--to `proc`. If `proc`
+    was itself built by these decorators, its layers are fused with the
+    new one into a single function that merges the defaults once, checks
+    the keys once and calls the undecorated function, so the cost of a
+    call does not grow with the number of stacked decorators.
+    """
+    inner = get_spec(proc)
+    if inner is None:
+        inner = Spec(proc)
+    spec = inner.layer(defaults, checks)
+    func = spec.compile(proc)
+    spec.generator = func
+    func.spec = spec
+    return func
+
+
+def expects(*keys, **defaults):
+    keys = keys + tuple(defaults.keys())
+    def wrapper(proc):
+        return _compose(proc, defaults, [('expects', k) for k in keys])
     return wrapper
 
 
 def requires(*keys, **defaults):
     keys = keys + tuple(defaults.keys())
     def wrapper(proc):
-        @wraps(proc)
-        def func(**attributes):
-            kwds = dict(defaults)
-            kwds.update(attributes)
-            for k in keys:
-                if k not in kwds:
-                    raise RequirementError(f"{func.__name__} requires {k}")
-            return proc(**kwds)
-        return func
+        return _compose(proc, defaults, [('requires', k) for k in keys])
     return wrapper
 
 
 def readwrite(proc):
-    @wraps(proc)
-    def func(**attributes):
-        kwds = {
-            'readable': True,
-            'writeable': True
-        }
-        kwds.update(attributes)
-        return proc(**kwds)
-    return func
+    return _compose(proc, {'readable': True, 'writeable': True})
 
 
 def readable(proc):
-    @wraps(proc)
-    def func(**attributes):
-        kwds = {
-            'readable': True,
-            'writeable': False
-        }
-        kwds.update(attributes)
-        return proc(**kwds)
-    return func
+    return _compose(proc, {'readable': True, 'writeable': False})
 
 
 def writeable(proc):
-    @wraps(proc)
-    def func(**attributes):
-        kwds = {
-            'readable': False,
-            'writeable': True
-        }
-        kwds.update(attributes)
-        return proc(**kwds)
-    return func
+    return _compose(proc, {'readable': False, 'writeable': True})
 
 
 def immutable(proc):
-    @wraps(proc)
-    def func(**attributes):
-        kwds = {
-            'readable': False,
-            'writeable': False
-        }
-        kwds.update(attributes)
-        return proc(**kwds)
-    return func
-
+    return _compose(proc, {'readable': False, 'writeable': False})
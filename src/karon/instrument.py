@@ -0,0 +1,296 @@
+__all__ = ["Instrument", "Tracer",
+           "enabled", "count", "timer", "timed", "span"]
+
+
+import os
+import threading
+import time
+from collections import Counter, defaultdict
+
+
+_active = []
+
+
+def enabled():
+    """
+    Returns whether any instrument is active.
+    """
+    return bool(_active)
+
+
+def count(name, n=1):
+    """
+    Increments the counter `name` by `n` in every active instrument.
+    """
+    for inst in _active:
+        inst.count(name, n)
+
+
+class timer(object):
+    def __init__(self, name):
+        """
+        Context manager that times its body as `name` in every instrument
+        active when the body is entered.
+
+        :param name, str: Name of the timed section.
+        """
+        self.name = name
+        self._instruments = ()
+        self._start = None
+
+    def __enter__(self):
+        if _active:
+            self._instruments = tuple(_active)
+            for inst in self._instruments:
+                inst.start(self.name)
+            self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        if self._instruments:
+            elapsed = time.perf_counter() - self._start
+            for inst in self._instruments:
+                inst.stop(self.name, elapsed)
+            self._instruments = ()
+        return False
+
+
+class span(timer):
+    def __init__(self, name, **args):
+        """
+        Context manager that marks its body as a pipeline stage, e.g.
+        reading a worksheet or one aggregate operation. Stages are timed
+        like `timer` and, additionally, reported to the `begin` and `end`
+        hooks with `args` describing the stage, so that a `Tracer` can
+        place them on a timeline.
+
+        :param name, str: Name of the stage.
+        :param args: JSON-serializable details of the stage.
+        """
+        super().__init__(name)
+        self.args = args
+
+    def __enter__(self):
+        if _active:
+            self._instruments = tuple(_active)
+            for inst in self._instruments:
+                inst.begin(self.name, self.args)
+            self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        if self._instruments:
+            elapsed = time.perf_counter() - self._start
+            for inst in reversed(self._instruments):
+                inst.end(self.name, self.args, elapsed)
+            self._instruments = ()
+        return False
+
+
+def timed(func, name):
+    """
+    Wraps `func` so that the time spent in each call is recorded as
+    `name`. This is used to separate the time spent in user callbacks
+    from the time spent in karon itself.
+
+    :param func: Function to be timed.
+    :param name, str: Name of the timed section.
+    :return: Wrapped function.
+    """
+    def wrapper(*args, **kwds):
+        with timer(name):
+            return func(*args, **kwds)
+    return wrapper
+
+
+class Instrument(object):
+    def __init__(self):
+        """
+        Collects counters and timings from the instrumented hot paths
+        while it is active. Activate it with `enable` or use it as a
+        context manager.
+
+        Derived classes can override `count`, `start`/`stop` (timers)
+        and `begin`/`end` (stages, see `span`) to forward the hooks
+        elsewhere. While no instrument is active, each
+        hook costs a single check.
+
+        Example:
+
+            with Instrument() as stats:
+                for root in forest:
+                    aggregate('Hv (HV)', reduce=flatten('Hv (HV)'))(root)
+            print(stats.report())
+
+        Counters:
+            nodes visited: nodes listed for a gets/puts traversal.
+            readable skipped: nodes hidden by a readable barrier.
+            writeable skipped: nodes hidden by a writeable barrier.
+            add_child: calls to `Node.add_child`.
+
+        Timings:
+            gets, puts: total time in `OpNode.gets`/`OpNode.puts`.
+            gets.func, gets.callback, puts.func: time in user functions.
+            _get_nodes: time building the node lists and masks.
+            generate_tree, from_parent: time building trees.
+        """
+        self.counts = Counter()
+        self.times = defaultdict(float)
+        self.calls = Counter()
+
+    def count(self, name, n=1):
+        self.counts[name] += n
+
+    def start(self, name):
+        pass
+
+    def stop(self, name, seconds):
+        self.times[name] += seconds
+        self.calls[name] += 1
+
+    def begin(self, name, args):
+        self.start(name)
+
+    def end(self, name, args, seconds):
+        self.stop(name, seconds)
+
+    def enable(self):
+        if self not in _active:
+            _active.append(self)
+        return self
+
+    def disable(self):
+        if self in _active:
+            _active.remove(self)
+        return self
+
+    def __enter__(self):
+        return self.enable()
+
+    def __exit__(self, *exc):
+        self.disable()
+        return False
+
+    def framework_time(self, name):
+        """
+        Time spent in `name` ('gets' or 'puts') outside of user
+        functions.
+        """
+        user = sum(v for k, v in iter(self.times.items())
+                   if k.startswith(f"{name}."))
+        return self.times.get(name, 0.0) - user
+
+    def report(self):
+        """
+        Summarizes the counters and timings.
+
+        :rtype: str
+        """
+        lines = []
+        for name in sorted(self.counts):
+            lines.append(f"{name}: {self.counts[name]}")
+        for name in sorted(self.times):
+            lines.append(f"{name}: {self.times[name]:.6f} s "
+                         f"({self.calls[name]} calls)")
+        for name in ('gets', 'puts'):
+            if name in self.times:
+                lines.append(f"{name} (framework): "
+                             f"{self.framework_time(name):.6f} s")
+        return '\n'.join(lines)
+
+
+class Tracer(Instrument):
+    def __init__(self):
+        """
+        Instrument that, in addition to the counters and timings, records
+        every stage (see `span`)--reading each worksheet, building trees,
+        each aggregate/propagate operation, each export--with its start
+        time and nesting, and writes them as a Chrome trace-event file
+        (open in chrome://tracing or https://ui.perfetto.dev) or as
+        collapsed stacks for flamegraph tools.
+
+        Example:
+
+            with Tracer() as trace:
+                nodes = ExcelIO(default=generic).load('tracking.xlsx')
+                forest = generate_tree(get('name'), get('parent'))(nodes)
+            trace.dump('nightly.json')
+            trace.dump('nightly.folded', format='collapsed')
+        """
+        super().__init__()
+        self.events = []
+        self._stack = []
+        self._origin = time.perf_counter()
+
+    def begin(self, name, args):
+        super().begin(name, args)
+        self._stack.append((name, time.perf_counter()))
+
+    def end(self, name, args, seconds):
+        super().end(name, args, seconds)
+        _, start = self._stack.pop()
+        self.events.append({
+            'name': name,
+            'start': start - self._origin,
+            'duration': seconds,
+            'args': dict(args),
+            'stack': tuple(n for n, _ in self._stack) + (name,)
+        })
+
+    def chrome(self):
+        """
+        Returns the stages as a Chrome trace-event document.
+
+        :rtype: dict
+        """
+        pid = os.getpid()
+        tid = threading.get_ident()
+        events = [{
+            'name': e['name'],
+            'ph': 'X',
+            'ts': 1e6 * e['start'],
+            'dur': 1e6 * e['duration'],
+            'pid': pid,
+            'tid': tid,
+            'args': e['args']
+        } for e in sorted(self.events, key=lambda e: e['start'])]
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def collapsed(self):
+        """
+        Returns the stages as collapsed stacks, one
+        "outer;inner;stage <microseconds>" line per unique stack, where
+        the time excludes the time spent in nested stages.
+
+        :rtype: str
+        """
+        totals = defaultdict(float)
+        for e in self.events:
+            totals[e['stack']] += e['duration']
+            if len(e['stack']) > 1:
+                totals[e['stack'][:-1]] -= e['duration']
+        return '\n'.join(f"{';'.join(stack)} {max(0, round(1e6 * t))}"
+                         for stack, t in sorted(totals.items()))
+
+    def dump(self, fobj, format: str = 'chrome'):
+        """
+        Writes the trace to a file.
+
+        :param fobj: Filename or file-like object.
+        :type fobj: str or file
+        :param format, str: 'chrome' (trace-event JSON, default) or
+            'collapsed' (flamegraph stacks).
+        :return: None
+        """
+        if format == 'chrome':
+            import json
+            text = json.dumps(self.chrome())
+        elif format == 'collapsed':
+            text = self.collapsed() + '\n'
+        else:
+            raise ValueError(f"Unknown trace format: {format}")
+        if hasattr(fobj, 'write'):
+            fobj.write(text)
+        else:
+            with open(fobj, 'w') as ofs:
+                ofs.write(text)
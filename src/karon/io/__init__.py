@@ -1,2 +1,25 @@
-# from .excel import read_excel
-from .excel import ExcelIO
\ No newline at end of file
+__all__ = ["CsvIO", "ExcelIO", "ParquetIO", "SqlIO"]
+
+
+# Backends are imported on first use: they depend on pandas, which takes
+# longer to import than the rest of karon together.
+_backends = {
+    'CsvIO': 'csv',
+    'ExcelIO': 'excel',
+    'ParquetIO': 'parquet',
+    'SqlIO': 'sql',
+}
+
+
+def __getattr__(name):
+    if name in _backends:
+        from importlib import import_module
+        module = import_module(f".{_backends[name]}", __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_backends))
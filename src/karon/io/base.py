@@ -1,5 +1,32 @@
 # from ..tree import Node
 # import pandas as pd
+import gc
+import threading
+from contextlib import contextmanager
+from ..schema import Schema
+
+
+@contextmanager
+def gc_paused():
+    """
+    Pauses the cyclic garbage collector while many nodes are created in
+    bulk. Nodes are containers, so creating many of them triggers repeated
+    collections of an ever larger heap, although none of them is garbage.
+    The previous state of the collector is restored on exit.
+
+    The collector is shared by all threads of the process, so it is only
+    paused if the calling thread is the only one running; otherwise this
+    does nothing.
+    """
+    enabled = gc.isenabled()
+    if not enabled or threading.active_count() > 1:
+        yield
+        return
+    gc.disable()
+    try:
+        yield
+    finally:
+        gc.enable()
 
 
 class BaseIO(dict):
@@ -23,6 +50,10 @@ class BaseIO(dict):
 
     A default generator can be specified using the ``set_default`` method.
 
+    Attribute names read by a reader are registered in its ``schema``
+    (see `karon.schema.Schema`), which can be shared between readers
+    through the ``schema`` keyword.
+
     .. note::
         It is up to the derived class to provide the necessary context
         for these entries. For example, populating the map with a string
@@ -35,9 +66,11 @@ class BaseIO(dict):
             del kwds['default']
         else:
             default = None
+        schema = kwds.pop('schema', None)
         super().__init__(*args, **kwds)
         self._default = default
         self._nodes = []
+        self._schema = Schema() if schema is None else schema
 
     def __getitem__(self, item):
         return self.get(item, self.get_default())
@@ -52,6 +85,10 @@ class BaseIO(dict):
     def nodes(self):
         return self._nodes
 
+    @property
+    def schema(self):
+        return self._schema
+
     def load(self, fobj, *args, **kwds):
         raise NotImplementedError('Derived classes must implement `load` '
                                   'to read contents from a file.')
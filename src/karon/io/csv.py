@@ -0,0 +1,126 @@
+from .base import BaseIO
+from .pandas import from_dataframe, literal_parser, parse_literals
+from .util import file_stem, report_collector, spool
+from .. import instrument
+from contextlib import nullcontext
+import csv
+import os
+import pandas as pd
+
+
+import logging
+_logging = logging.getLogger(__name__)
+
+
+# rows per chunk, if iter_load yields single nodes
+_CHUNKSIZE = 10000
+
+
+class CsvIO(BaseIO):
+    """
+    Reads data from (optionally multiple) comma-separated value files.
+
+    Rows are passed to the generator registered under the stem of the
+    file name--"hardness" for "data/hardness.csv"--just as `ExcelIO`
+    selects the generator by sheet name.
+    """
+    def __init__(self, *args, **kwds):
+        super().__init__(*args, **kwds)
+
+    def load(self, fobj, **kwds):
+        """
+        Loads node data from the specified CSV file(s).
+
+        :param fobj: File(s) to be read.
+        :type fobj: str, file-like object, or list of these
+        :param kwds: See `iter_load`.
+        :return: Nodes read from the file(s).
+        :rtype: list of Nodes
+        """
+        kwds.pop('chunksize', None)
+        with instrument.span('CsvIO.load'):
+            return list(self.iter_load(fobj, **kwds))
+
+    def iter_load(self, fobj, chunksize=None, arrays=False, report=False,
+                  **kwds):
+        """
+        Loads node data from the specified CSV file(s) lazily, one chunk
+        of rows at a time.
+
+        Each chunk is parsed by `pandas.read_csv`, its cells that hold
+        lists, tuples, etc. are parsed as in `ExcelIO.load`, and its nodes
+        are created in bulk, so that only one chunk is held in memory.
+
+        :param fobj: File(s) to be read, in order.
+        :type fobj: str, file-like object, or list of these
+        :param chunksize: If given, lists of (at most) this many nodes are
+            yielded rather than single nodes. Default: None.
+        :type chunksize: int or None
+        :param arrays: See `ExcelIO.load`.
+        :type arrays: bool
+        :param report: See `ExcelIO.load`. The required/expected keys are
+            checked once per chunk.
+        :type report: bool or MissingFieldReport
+        :param kwds: Keywords passed to `pandas.read_csv`, e.g. `sep`.
+        :return: Generator of nodes, or of lists of nodes.
+        """
+        collector, report = report_collector(report)
+        if isinstance(fobj, (str, os.PathLike)) or hasattr(fobj, 'read'):
+            fobj = [fobj]
+        for source in fobj:
+            generator = self[file_stem(source)]
+            convert = literal_parser(arrays)
+            try:
+                reader = pd.read_csv(source, chunksize=chunksize or _CHUNKSIZE,
+                                     **kwds)
+            except pd.errors.EmptyDataError:
+                _logging.debug(f"{source} is empty.")
+                continue
+            with reader:
+                for df in reader:
+                    with instrument.span('CsvIO.chunk', file=str(source)):
+                        df = parse_literals(df, parser=convert)
+                        df.columns = [self.schema.intern(c)
+                                      for c in df.columns]
+                        with nullcontext() if collector is None \
+                                else collector:
+                            nodes = from_dataframe(df, generator)
+                    if chunksize is None:
+                        yield from nodes
+                    else:
+                        yield nodes
+        if collector is not None and collector is not report:
+            collector.warn()
+
+    def dump(self, fobj, *args, **kwds):
+        """
+        Dumps args (lists of nodes) to a file-like object, one row at a
+        time.
+
+        The columns are the attributes of all nodes, in order of first
+        appearance. Lists, tuples, dictionaries and arrays are written so
+        that `load` parses them again; missing and NaN values are empty.
+        The nodes are read only once, so args may be generators, e.g.
+        from `iter_load` (see `karon.io.util.spool`).
+
+        :param fobj: File to which the nodes are written in CSV format.
+        :type fobj: str or file-like object
+        :param args: Lists of nodes that are to be written to the file object.
+        :type args: list of nodes
+        :param kwds: Keywords passed to `csv.writer`, e.g. `delimiter`.
+        :return: None
+        """
+        with instrument.span('CsvIO.dump', file=str(fobj)):
+            columns, rows = spool(args)
+            columns = columns.get(None, [])
+            if isinstance(fobj, (str, os.PathLike)):
+                with open(fobj, 'w', newline='') as ofs:
+                    self._write(ofs, columns, rows, kwds)
+            else:
+                self._write(fobj, columns, rows, kwds)
+
+    @staticmethod
+    def _write(ofs, columns, rows, kwds):
+        writer = csv.writer(ofs, **kwds)
+        writer.writerow(columns)
+        writer.writerows(cells for _, cells in rows)
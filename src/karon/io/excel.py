@@ -1,24 +1,343 @@
 from .base import BaseIO
-from .pandas import to_dataframe
-import ast
+from .pandas import (to_dataframe, from_dataframe, from_records,
+                     literal_parser, parse_literals)
+from .util import report_collector, spool
+from .. import instrument
+from ..decorators import MissingFieldReport
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+import hashlib
+import numpy as np
+import os
+import pickle
+import re
 import pandas as pd
 
 
-import sys
 import logging
 _logging = logging.getLogger(__name__)
-logging.basicConfig(level=logging.DEBUG,
-                    stream=sys.stdout,
-                    format="[%(asctime)s] %(levelname)s:%(name)s:%(message)s",
-                    datefmt="%Y-%m-%d %H:%M:%S")
+
+
+# bump to invalidate existing cache files
+_CACHE_VERSION = 1
+# data rows on an Excel worksheet, below the header
+MAX_ROWS = 1048575
+# rows per chunk, if iter_load yields single nodes
+_CHUNKSIZE = 1024
+
+
+class _Registered(object):
+    """Type of `REGISTERED`."""
+    def __repr__(self):
+        return 'REGISTERED'
+
+    def __reduce__(self):
+        # unpickled, e.g. in a worker process, as the same object
+        return 'REGISTERED'
+
+
+# `sheet_name` that selects the sheets with a registered generator
+REGISTERED = _Registered()
+
+_READ_OPTIONS = ('sheet_name',
+                 'header',
+                 'skiprows',
+                 'skip_footer',
+                 'index_col',
+                 'names',
+                 'usecols',
+                 'parse_dates',
+                 'date_parser',
+                 'na_values',
+                 'thousands',
+                 'convert_float',
+                 'converters',
+                 'dtype',
+                 'true_values',
+                 'false_values',
+                 'engine',
+                 'squeeze')
+
+
+def _read_options(args, kwds):
+    """
+    Combines the positional and keyword parameters to `pandas.read_excel`
+    and sets the defaults, e.g. sheet_name --> None (all).
+    """
+    kwds = dict(kwds)
+    for key, value in zip(_READ_OPTIONS, args):
+        kwds[key] = value
+    kwds['sheet_name'] = kwds.get('sheet_name', None)
+    return kwds
+
+
+def _read_sheets(fobj, kwds):
+    """
+    Reads worksheets as a dict of DataFrames keyed by sheet name, even if
+    a single sheet is requested.
+    """
+    df = pd.read_excel(fobj, **kwds)
+    if isinstance(df, pd.DataFrame):
+        df = {kwds['sheet_name']: df}
+    return df
+
+
+def _dedup(names, unnamed=()):
+    """
+    Renames duplicate column names as `pandas.read_excel` does: the second
+    "x" becomes "x.1", the third "x.2", etc., skipping names that are in
+    the header. Named columns are renamed before the `unnamed` ones, i.e.
+    the positions of empty headers.
+    """
+    names = list(names)
+    counts = {}
+    unnamed = list(unnamed)
+    order = [i for i in range(len(names)) if i not in set(unnamed)] + unnamed
+    for i in order:
+        name = original = names[i]
+        count = counts.get(name, 0)
+        if count > 0:
+            while count > 0:
+                counts[original] = count + 1
+                name = f"{original}.{count}"
+                if name in names:
+                    count += 1
+                else:
+                    count = counts.get(name, 0)
+            names[i] = name
+        counts[name] = count + 1
+    return names
+
+
+def _freeze(df):
+    """
+    Marks the numpy arrays in the object columns of `df` read-only again:
+    the flag does not survive being pickled back from a worker process.
+    """
+    for i, dtype in enumerate(df.dtypes):
+        if dtype == object:
+            for value in df.iloc[:, i]:
+                if isinstance(value, np.ndarray):
+                    value.flags.writeable = False
+
+
+def _cache_path(directory, fobj, kwds, arrays):
+    """
+    Path of the cache file for the workbook `fobj` read with the given
+    options: a hash of the content of the workbook, the options and the
+    versions that determine how it is parsed. Options are hashed by their
+    `repr`, so options such as functions, whose repr changes between
+    sessions, are never found in the cache.
+    """
+    digest = hashlib.sha256()
+    if isinstance(fobj, (str, os.PathLike)):
+        with open(fobj, 'rb') as ifs:
+            for block in iter(lambda: ifs.read(1 << 20), b''):
+                digest.update(block)
+    else:
+        # pandas reads the whole file, wherever its position
+        position = fobj.tell()
+        fobj.seek(0)
+        digest.update(fobj.read())
+        fobj.seek(position)
+    options = (_CACHE_VERSION, pd.__version__, bool(arrays),
+               sorted(kwds.items(), key=lambda kv: kv[0]))
+    digest.update(repr(options).encode('utf-8'))
+    return os.path.join(directory, digest.hexdigest() + '.pkl')
+
+
+def _trusted(path):
+    """
+    Whether the file or directory at `path` can only have been written by
+    this user: it is owned by this user and is not writable by its group
+    or by others. Always True where ownership is not available (Windows).
+    """
+    if not hasattr(os, 'getuid'):  # pragma: no cover
+        return True
+    stat = os.stat(path)
+    return stat.st_uid == os.getuid() and not stat.st_mode & 0o022
+
+
+def _read_cache(path):
+    """
+    Returns the parsed worksheets stored at `path`, or None if there are
+    none or they cannot be read.
+
+    Cache files are pickles, and loading a pickle can run arbitrary code,
+    so they are only read if both the file and its directory can only
+    have been written by this user (see `_trusted`).
+    """
+    try:
+        if not (_trusted(os.path.dirname(path) or '.') and _trusted(path)):
+            _logging.warning(f"Ignoring cache file {path}: it, or its "
+                             f"directory, is writable by other users.")
+            return None
+        with open(path, 'rb') as ifs:
+            return pickle.load(ifs)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        _logging.warning(f"Ignoring unreadable cache file {path}: {e}")
+        return None
+
+
+def _write_cache(path, frames):
+    """
+    Stores the parsed worksheets at `path`. The file is written under a
+    temporary name and then renamed, so that concurrent readers never see
+    a partial file. A new cache directory is only accessible to this
+    user. If the worksheets cannot be stored, the cache is left as it was.
+    """
+    os.makedirs(os.path.dirname(path) or '.', mode=0o700, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, 'wb') as ofs:
+            # protocol 5 keeps read-only arrays (see `arrays`) read-only
+            pickle.dump(frames, ofs, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+    except Exception as e:
+        _logging.warning(f"Could not write cache file {path}: {e}")
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+
+
+def _sheet_names(fobj):
+    """
+    Returns the names of the worksheets in `fobj`, without reading them.
+    """
+    position = None if isinstance(fobj, (str, os.PathLike)) else fobj.tell()
+    with pd.ExcelFile(fobj) as xlsx:
+        names = list(xlsx.sheet_names)
+    if position is not None:
+        fobj.seek(position)
+    return names
+
+
+def _read_parsed(job):
+    """
+    Reads and parses the selected worksheets of one workbook, opening it
+    only once. Module-level, so that it can be run in a worker process by
+    `ExcelIO.load_many`.
+
+    :param job: Path, parameters to `pandas.read_excel`, the names of the
+        sheets with a registered generator (used if `sheet_name` is
+        `REGISTERED`) and the `arrays` option of `parse_literals`.
+    :type job: tuple
+    :return: Parsed worksheets, by name.
+    :rtype: dict of pandas.DataFrame
+    """
+    path, kwds, registered, arrays = job
+    kwds = dict(kwds)
+    selection = kwds['sheet_name']
+    with pd.ExcelFile(path, engine=kwds.pop('engine', None)) as xlsx:
+        if selection is REGISTERED:
+            kwds['sheet_name'] = [name for name in xlsx.sheet_names
+                                  if name in registered]
+        elif isinstance(selection, re.Pattern):
+            kwds['sheet_name'] = [name for name in xlsx.sheet_names
+                                  if selection.fullmatch(name)]
+        df = _read_sheets(xlsx, kwds)
+    return {name: parse_literals(sheet, arrays=arrays)
+            for name, sheet in df.items()}
+
+
+class DeferredSheets(Mapping):
+    def __init__(self, reader, fobj, names, kwds, arrays):
+        """
+        Worksheets of a workbook that are read, and converted into nodes,
+        only when first accessed. See `ExcelIO.deferred`.
+
+        :param reader: Reader that provides the node generators and the
+            cache.
+        :type reader: ExcelIO
+        :param fobj: Workbook. A file-like object is read from its
+            current position, which is restored after each read.
+        :param names: Names of the deferred worksheets.
+        :type names: list of str
+        :param kwds: Other parameters to `pandas.read_excel`.
+        :type kwds: dict
+        :param arrays: See `ExcelIO.load`.
+        :type arrays: bool
+        """
+        self._reader = reader
+        self._fobj = fobj
+        self._position = None if isinstance(fobj, (str, os.PathLike)) \
+            else fobj.tell()
+        self._names = list(names)
+        self._kwds = kwds
+        self._arrays = arrays
+        self._nodes = {}
+
+    def __repr__(self):
+        return f"DeferredSheets({self._names!r})"
+
+    def __iter__(self):
+        return iter(self._names)
+
+    def __len__(self):
+        return len(self._names)
+
+    def __contains__(self, name):
+        return name in self._names
+
+    def __getitem__(self, name):
+        if name not in self._names:
+            raise KeyError(name)
+        if name not in self._nodes:
+            kwds = dict(self._kwds, sheet_name=[name])
+            if self._position is not None:
+                self._fobj.seek(self._position)
+            try:
+                df, arrays = self._reader._read(self._fobj, kwds,
+                                                self._arrays)
+            finally:
+                if self._position is not None:
+                    self._fobj.seek(self._position)
+            self._nodes[name] = self._reader._from_sheet(
+                name, df[name], arrays=arrays)
+        return self._nodes[name]
+
+    def loaded(self, name):
+        """
+        Whether worksheet `name` has been read.
+        """
+        return name in self._nodes
 
 
 class ExcelIO(BaseIO):
     """
     Reads data from (optionally multiple) worksheets in Microsoft Excel.
+
+    Parsed worksheets can be cached on disk through the ``cache`` keyword,
+    the path to a directory, e.g. ``ExcelIO(cache='.karon-cache')``. A
+    workbook that is loaded again, unchanged and with the same options,
+    is then read from the cache, which skips both reading the XLSX file
+    and parsing its cells.
+
+    Cache files are pickles, which can run code when loaded, so the cache
+    directory must only be writable by trusted users. It is created with
+    owner-only permissions, and cache files in a directory, or cache files
+    themselves, that other users can write to are ignored.
     """
+    REGISTERED = REGISTERED
+
     def __init__(self, *args, **kwds):
+        cache = kwds.pop('cache', None)
         super().__init__(*args, **kwds)
+        self.cache = cache
+        self._deferred = {}
+
+    @property
+    def deferred(self):
+        """
+        Worksheets of the last workbook read by `load` that were not
+        selected by its `sheet_name`, as a mapping from sheet name to the
+        list of nodes on that sheet. Each sheet is read on first access.
+        """
+        return self._deferred
 
 
     def load(self, fobj, *args, **kwds):
@@ -27,87 +346,361 @@ class ExcelIO(BaseIO):
 
         :param filename: File to be read.
         :type filename: valid io object to pandas.read_excel.
-        :param sheet_name: Sheetnames to be read. Default: all.
-        :type sheet_name: str, iterable of str, or None (all, default)
+        :param sheet_name: Sheetnames to be read. `REGISTERED` (also
+            `ExcelIO.REGISTERED`) reads only the sheets that have a
+            generator registered in this reader, and a compiled regular
+            expression reads only the sheets whose names it matches; the
+            others are available, and read on first access, through
+            `deferred`. Default: all.
+        :type sheet_name: str, iterable of str, REGISTERED, re.Pattern, or
+            None (all, default)
+        :param arrays: If True, cells that hold a list or tuple of
+            numbers, e.g. "[363, 348, 346]", are stored as read-only
+            float64 numpy arrays rather than as tuples. Default: False.
+        :type arrays: bool
+        :param report: If True, missing expected fields (see
+            `karon.decorators.expects`) are counted across all sheets and
+            reported in a single warning at the end of the load. If a
+            `karon.decorators.MissingFieldReport`, the counts are added to
+            that report and no warning is issued. Default: False, warn
+            once per sheet and missing field.
+        :type report: bool or MissingFieldReport
         :return: Nodes read from the Excel workbook.
         :rtype: list of Nodes
         """
-        def convert(obj):
-            """
-            Pandas `read_excel` has the `converters` option that allows the
-            user to specify converters for each column. The value of this
-            option must be a dictionary that maps the column name or index
-            of the column to a function that accepts the cell data (as a
-            string) and returns the converted value.
-
-            If python-style lists, tuples, dictionaries, etc. are stored
-            in an Excel cell, Converter calls ast.literal_eval as a conversion
-            for each cell regardless of the key (column name/column index).
-            """
-            try:
-                return ast.literal_eval(obj)
-            except (ValueError, SyntaxError):
-                return obj
-
-        # Process all parameters to read_excel
-        for i, key in enumerate(('sheet_name',
-                                 'header',
-                                 'skiprows',
-                                 'skip_footer',
-                                 'index_col',
-                                 'names',
-                                 'usecols',
-                                 'parse_dates',
-                                 'date_parser',
-                                 'na_values',
-                                 'thousands',
-                                 'convert_float',
-                                 'converters',
-                                 'dtype',
-                                 'true_values',
-                                 'false_values',
-                                 'engine',
-                                 'squeeze')):
-            try:
-                kwds[key] = args[i]
-            except IndexError:
-                break
-        # set defaults, e.g. sheet_name --> None
-        kwds['sheet_name'] = kwds.get('sheet_name', None)
-        # read the file
-        df = pd.read_excel(fobj, **kwds)
-        # convert each element to handle lists, tuples, etc.
-        _logging.debug(f"Reading {fobj}...")
-        for sheet_name in df:
-            _logging.debug(f"Reading {sheet_name}...")
-            df[sheet_name] = df[sheet_name].applymap(convert)
-            _logging.debug(f"Read {len(df[sheet_name])} entries from {sheet_name}.")
-        _logging.debug(f"Read {len(df)} sheets from {fobj}.")
-        # convert each entry into a node
-        _logging.debug(f"Creating nodes from {fobj}...")
-        nodes = [self[str(key)](**row)
-                 for key in df.keys()
-                 for (index, row) in df[key].iterrows()]
-        _logging.debug(f"Created {len(nodes)} nodes from {fobj}.")
+        arrays = kwds.pop('arrays', False)
+        collector, report = report_collector(kwds.pop('report', False))
+        kwds = _read_options(args, kwds)
+        self._deferred = {}
+        selection = kwds['sheet_name']
+        if selection is REGISTERED or isinstance(selection, re.Pattern):
+            names = _sheet_names(fobj)
+            if selection is REGISTERED:
+                selected = [name for name in names if name in self]
+            else:
+                selected = [name for name in names
+                            if selection.fullmatch(name)]
+            kwds['sheet_name'] = selected
+            self._deferred = DeferredSheets(
+                self, fobj, [name for name in names if name not in selected],
+                kwds, arrays)
+        with instrument.span('ExcelIO.load', file=str(fobj)):
+            df, arrays = self._read(fobj, kwds, arrays)
+            # parse cells that hold lists, tuples, etc., then convert
+            # each entry into a node
+            _logging.debug(f"Reading {fobj}...")
+            nodes = []
+            with nullcontext() if collector is None else collector:
+                for sheet_name in df:
+                    nodes.extend(self._from_sheet(sheet_name,
+                                                  df[sheet_name],
+                                                  arrays=arrays))
+            if collector is not None and collector is not report:
+                collector.warn()
+            _logging.debug(f"Read {len(df)} sheets from {fobj}.")
+            _logging.debug(f"Created {len(nodes)} nodes from {fobj}.")
         # done
         return nodes
 
-    def dump(self, fobj, *args, **kwds):
+    def _read(self, fobj, kwds, arrays):
+        """
+        Reads worksheets from the workbook, or the parsed worksheets from
+        the cache, if enabled.
+
+        :return: Worksheets, by name, and the `arrays` option for
+            `_from_sheet`: None if the worksheets are already parsed.
+        :rtype: (dict of pandas.DataFrame, bool or None)
+        """
+        if self.cache is None:
+            with instrument.span('read_excel', file=str(fobj)):
+                return _read_sheets(fobj, kwds), arrays
+        path = _cache_path(self.cache, fobj, kwds, arrays)
+        df = _read_cache(path)
+        if df is None:
+            with instrument.span('read_excel', file=str(fobj)):
+                df = _read_sheets(fobj, kwds)
+            df = {name: parse_literals(sheet, arrays=arrays)
+                  for name, sheet in df.items()}
+            _write_cache(path, df)
+        return df, None
+
+    def load_many(self, paths, workers=None, provenance=None, **kwds):
+        """
+        Loads node data from several Excel workbooks, reading and parsing
+        the worksheets in parallel.
+
+        Each workbook is read, and the cells of its worksheets parsed
+        (see `karon.io.pandas.parse_literals`), in a separate process.
+        Nodes are then created in this process, since node generators
+        need not be picklable. The result does not depend on the number
+        of workers: nodes are ordered by workbook (in the order given),
+        then by worksheet, then by row, exactly as from consecutive calls
+        to `load`.
+
+        :param paths: Workbooks to be read. If a mapping, the keys label
+            the workbooks, e.g. by who supplied them, and the values are
+            the paths.
+        :type paths: iterable of str or dict of label: str
+        :param workers: Number of worker processes. If 0 or 1, the
+            workbooks are read in this process. Default: the number of
+            processors.
+        :type workers: int or None
+        :param provenance: If given, each node's `provenance` attribute
+            is set to the label (if `paths` is a mapping) or the path of
+            the workbook it was read from. A ValueError is raised if a
+            worksheet already has a column of that name. Default: None,
+            not set.
+        :type provenance: str
+        :param kwds: Keywords passed to `load`, e.g. `sheet_name`,
+            `arrays` or `report`. Because the workbooks are read in other
+            processes, all options must be picklable.
+        :return: Nodes read from all workbooks.
+        :rtype: list of Nodes
+        """
+        if isinstance(paths, Mapping):
+            labels, paths = list(paths.keys()), list(paths.values())
+        else:
+            paths = list(paths)
+            labels = [str(path) for path in paths]
+        arrays = kwds.pop('arrays', False)
+        collector, report = report_collector(kwds.pop('report', False))
+        kwds = _read_options((), kwds)
+        registered = None
+        if kwds['sheet_name'] is REGISTERED:
+            registered = set(self.keys())
+        with instrument.span('ExcelIO.load_many', files=len(paths)):
+            # one task per workbook, so that each is opened only once
+            jobs = [(path, kwds, registered, arrays) for path in paths]
+            if workers is not None and workers <= 1:
+                frames = list(map(_read_parsed, jobs))
+            else:
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    frames = list(pool.map(_read_parsed, jobs))
+            nodes = []
+            with nullcontext() if collector is None else collector:
+                for label, path, sheets in zip(labels, paths, frames):
+                    for name, df in sheets.items():
+                        if arrays:
+                            _freeze(df)
+                        if provenance is not None:
+                            if provenance in df.columns:
+                                raise ValueError(
+                                    f"Sheet {name!r} of {path} already has "
+                                    f"a {provenance!r} column.")
+                            df[provenance] = label
+                        nodes.extend(self._from_sheet(name, df,
+                                                      arrays=None))
+            if collector is not None and collector is not report:
+                collector.warn()
+        return nodes
+
+    def iter_load(self, fobj, sheet_name=None, chunksize=None,
+                  arrays=False, report=False):
+        """
+        Loads node data from the specified Excel workbook lazily, one row
+        at a time, without reading whole worksheets into memory.
+
+        Rows are streamed from a read-only workbook, so memory use is
+        bounded by the size of a chunk rather than of the workbook. Each
+        worksheet must be a plain table: a header row, the first non-empty
+        row, followed by one row per node. Cells to the right of the last
+        header are ignored, empty cells are NaN and empty rows are skipped.
+        Duplicate headers are renamed as by `load`, e.g. "x", "x.1". Unlike
+        `load`, integer cells are not promoted to float in columns that
+        also hold non-integers.
+
+        :param fobj: File to be read.
+        :type fobj: str or file-like object
+        :param sheet_name: Sheetnames to be read. Default: all.
+        :type sheet_name: str, iterable of str, or None (all, default)
+        :param chunksize: If given, lists of (at most) this many nodes are
+            yielded rather than single nodes. Default: None.
+        :type chunksize: int or None
+        :param arrays: See `load`.
+        :type arrays: bool
+        :param report: See `load`. The required/expected keys are checked
+            once per chunk. Without a report, a missing expected key is
+            warned about once per sheet, as by `load`.
+        :type report: bool or MissingFieldReport
+        :return: Generator of nodes, or of lists of nodes.
+        """
+        from openpyxl import load_workbook
+
+        collector, report = report_collector(report)
+        convert = literal_parser(arrays)
+        size = chunksize or _CHUNKSIZE
+        if isinstance(sheet_name, str):
+            sheet_name = [sheet_name]
+        workbook = load_workbook(fobj, read_only=True, data_only=True)
+        try:
+            names = workbook.sheetnames if sheet_name is None else sheet_name
+            for name in names:
+                generator = self[str(name)]
+                rows = workbook[name].iter_rows(values_only=True)
+                keys = None
+                chunk = []
+                # without a report, warn only for the first chunk
+                active = collector
+                for row in rows:
+                    if all(value is None for value in row):
+                        continue
+                    if keys is None:
+                        # the sheet's dimensions may include empty,
+                        # formatted columns after the last header
+                        width = max(i for i, key in enumerate(row)
+                                    if key is not None) + 1
+                        keys = _dedup(
+                            [f"Unnamed: {i}" if key is None else key
+                             for i, key in enumerate(row[:width])],
+                            [i for i, key in enumerate(row[:width])
+                             if key is None])
+                        keys = [self.schema.intern(key) for key in keys]
+                        continue
+                    chunk.append(tuple(
+                        np.nan if value is None else convert(value)
+                        for value in row[:width]) +
+                        (np.nan,) * (width - len(row)))
+                    if len(chunk) == size:
+                        yield from self._stream(chunk, keys, generator,
+                                                active, chunksize)
+                        chunk = []
+                        if active is None:
+                            active = MissingFieldReport()
+                if chunk:
+                    yield from self._stream(chunk, keys, generator,
+                                            active, chunksize)
+        finally:
+            workbook.close()
+        if collector is not None and collector is not report:
+            collector.warn()
+
+    @staticmethod
+    def _stream(chunk, keys, generator, collector, chunksize):
+        """
+        Creates the nodes for a chunk of rows read by `iter_load` and
+        returns them as an iterable of what `iter_load` yields.
+        """
+        with nullcontext() if collector is None else collector:
+            nodes = from_records(keys, chunk, generator)
+        return nodes if chunksize is None else (nodes,)
+
+    def _from_sheet(self, sheet_name, df, arrays=False):
+        """
+        Creates the nodes from one worksheet.
+
+        :param sheet_name: Name of the worksheet, which selects the node
+            generator.
+        :type sheet_name: str
+        :param df: Contents of the worksheet.
+        :type df: pandas.DataFrame
+        :param arrays: See `load`. If None, the cells are already parsed.
+        :type arrays: bool or None
+        :return: Nodes created from the rows of the worksheet.
+        :rtype: list of Nodes
+        """
+        with instrument.span('ExcelIO.sheet', sheet=str(sheet_name)):
+            _logging.debug(f"Reading {sheet_name}...")
+            if arrays is not None:
+                df = parse_literals(df, arrays=arrays)
+            df.columns = [self.schema.intern(c) for c in df.columns]
+            _logging.debug(f"Read {len(df)} entries from {sheet_name}.")
+            return from_dataframe(df, self[str(sheet_name)])
+
+    def dump(self, fobj, *args, stream=False, sheet=None,
+             max_rows=MAX_ROWS, **kwds):
         """
         Dumps args (lists of nodes) to a file-like object.
 
+        By default, all nodes are collected into a single DataFrame that is
+        written to a single sheet. In streaming mode, rows are written one
+        at a time through a write-only workbook, so memory use does not
+        grow with the number of nodes; a sheet that reaches `max_rows` data
+        rows continues on a new sheet, "<name> (2)", etc.; nodes can be
+        split across sheets with `sheet`; and the nodes are read only once,
+        so args may be generators, e.g. from `iter_load`.
+
         :param fobj: File-like object to which the nodes are written in Excel
             format.
         :type fobj: File-like object (str or file)
         :param args: Lists of nodes that are to be written to the file object.
         :type args: list of nodes
+        :param stream: Write in streaming mode. Default: False.
+        :type stream: bool
+        :param sheet: Streaming mode only. Sheet to which each node is
+            written: either a function of the node, e.g.
+            ``lambda node: type(node).__name__``, or the key of the
+            attribute that names the sheet. Default: None, a single sheet.
+        :type sheet: callable or str
+        :param max_rows: Streaming mode only. Maximum number of data rows
+            per sheet. Default: 1048575, the most Excel allows below the
+            header.
+        :type max_rows: int
         :param kwds: Not used.
         :return: None
         """
-        nodes = []
-        for arg in args:
-            nodes.extend(arg)
-        to_dataframe(nodes).to_excel(fobj, index=False)
+        with instrument.span('ExcelIO.dump', file=str(fobj)):
+            if stream:
+                _stream_dump(fobj, args, sheet, max_rows)
+                return
+            nodes = []
+            for arg in args:
+                nodes.extend(arg)
+            to_dataframe(nodes).to_excel(fobj, index=False)
+
+
+def _sheet_title(name):
+    """
+    Valid worksheet title from `name`: at most 31 characters, none of
+    which are []:*?/\\.
+    """
+    title = re.sub(r'[\[\]:*?/\\]', '_', str(name)).strip("'")
+    return title[:31] or 'Sheet'
+
+
+def _stream_dump(fobj, groups, sheet, max_rows):
+    """
+    Writes nodes through a write-only workbook. See `ExcelIO.dump`.
+
+    The nodes are read once (see `karon.io.util.spool`): the columns of
+    each sheet, in order of first appearance, are collected before the
+    rows are written.
+    """
+    from openpyxl import Workbook
+
+    if sheet is None:
+        def name_of(node):
+            return 'Sheet1'
+    elif callable(sheet):
+        def name_of(node):
+            return _sheet_title(sheet(node))
+    else:
+        def name_of(node):
+            return _sheet_title(node.contents.get(sheet, 'Sheet1'))
+    columns, rows = spool(groups, name_of)
+    workbook = Workbook(write_only=True)
+    worksheets = {}
+    titles = set()
+
+    def new_sheet(name):
+        title, n = name, 1
+        while title.lower() in titles:
+            n += 1
+            suffix = f" ({n})"
+            title = name[:31 - len(suffix)] + suffix
+        titles.add(title.lower())
+        worksheet = workbook.create_sheet(title)
+        worksheet.append(columns[name])
+        return [worksheet, 0]
+
+    for name, cells in rows:
+        state = worksheets.get(name)
+        if state is None or state[1] >= max_rows:
+            state = worksheets[name] = new_sheet(name)
+        state[0].append(cells)
+        state[1] += 1
+    if not worksheets:
+        workbook.create_sheet('Sheet1')
+    workbook.save(fobj)
 
 
 # def read_excel(*args, **kwds):
@@ -1,4 +1,10 @@
+import ast
+import copy
+import re
+import numpy as np
 import pandas as pd
+from .base import gc_paused
+from ..decorators import get_spec
 
 
 def to_dataframe(nodes):
@@ -24,3 +30,231 @@ def to_dataframe(nodes):
         for k in (keyset - set(node.contents.keys())):
             result[k].append('')
     return pd.DataFrame(result)
+
+
+def from_dataframe(df, generator):
+    """
+    Creates one node per row of a pandas.DataFrame.
+
+    Rows are assembled from the column arrays rather than from a
+    `pandas.Series` per row. If `generator` was built from the decorators
+    in `karon.decorators`, every row has the same keys, so the defaults
+    and readable/writeable flags of all decorator layers are applied, and
+    the required/expected keys are checked against the columns, once for
+    the whole DataFrame. Each row is then passed straight to the
+    undecorated function: a missing required column raises a single
+    RequirementError before any node is built, and a missing expected
+    column warns once rather than once per row.
+
+    :param df: Table with one node per row and one attribute per column.
+    :type df: pandas.DataFrame
+    :param generator: Node generator.
+    :type generator: Function with signature `generator(**row) -> Node`
+    :return: Nodes created from the rows of the DataFrame.
+    :rtype: list
+    """
+    keys = list(df.columns)
+    columns = [df[k].tolist() for k in keys]
+    return _create(keys, zip(*columns), len(df), generator)
+
+
+def from_records(keys, records, generator):
+    """
+    Creates one node per record, e.g. per row read from a file, where all
+    records hold values for the same keys. See `from_dataframe`: the keys
+    are checked, and the defaults applied, once for all records.
+
+    :param keys: Attribute names, one per value in each record.
+    :type keys: list of str
+    :param records: Values of each node, in the order of `keys`.
+    :type records: list of tuples
+    :param generator: Node generator.
+    :type generator: Function with signature `generator(**row) -> Node`
+    :return: Nodes created from the records.
+    :rtype: list
+    """
+    return _create(keys, records, len(records), generator)
+
+
+def _create(keys, rows, count, generator):
+    """
+    Creates one node per row, an iterable of `count` tuples of values for
+    `keys`. See `from_records`.
+    """
+    keys = list(keys)
+    spec = get_spec(generator)
+    if spec is None:
+        with gc_paused():
+            return [generator(**dict(zip(keys, values))) for values in rows]
+    if count:
+        spec.check(set(keys), count=count)
+    # defaults not provided by a key are the same for every row
+    constant = {k: v for k, v in iter(spec.defaults.items()) if k not in keys}
+    proc = spec.proc
+    with gc_paused():
+        return [proc(**dict(zip(keys, values)), **constant)
+                for values in rows]
+
+
+# strings that `ast.literal_eval` may accept: those that start, after any
+# whitespace, line continuations and comments, with a bracket, quote, sign
+# or digit; True, False, None and set(); and string and bytes literals with
+# a prefix, e.g. b'...', r"...". False positives are fine, literal_eval has
+# the final say; false negatives are not.
+_CANDIDATE = re.compile(r"""(?:\s|\\|#[^\n]*)*"""
+                        r"""(?:[\[({'"+\-.0-9]"""
+                        r"""|(?:True|False|None|set\s*\(\s*\))(?![\w.(\[])"""
+                        r"""|[bBrRuU]{1,2}['"])""")
+# distinct strings remembered by a literal parser
+_MEMO_SIZE = 1 << 16
+# parsed values that may be shared between cells
+_IMMUTABLE = (str, bytes, int, float, complex, bool, type(None), np.ndarray)
+
+
+def _as_array(obj):
+    """
+    Stores a list or tuple of numbers as a read-only, contiguous float64
+    array. Read-only, because the same array is shared, not copied, by
+    every node it is propagated to. Anything else is returned unchanged.
+    """
+    if isinstance(obj, (list, tuple)):
+        try:
+            arr = np.asarray(obj)
+        except ValueError:
+            # ragged, nested sequences
+            return obj
+        if arr.dtype.kind in 'iuf':
+            arr = np.ascontiguousarray(arr, dtype=float)
+            arr.flags.writeable = False
+            return arr
+    return obj
+
+
+def _copier(value):
+    """
+    Returns the cheapest function that copies a parsed value such that no
+    two cells share a mutable object, or None if it can be shared.
+    """
+    if isinstance(value, _IMMUTABLE):
+        return None
+    if isinstance(value, (list, set, frozenset, tuple)):
+        flat = all(isinstance(v, _IMMUTABLE) for v in value)
+        if isinstance(value, (tuple, frozenset)):
+            return None if flat else copy.deepcopy
+        return type(value).copy if flat else copy.deepcopy
+    if isinstance(value, dict):
+        flat = all(isinstance(v, _IMMUTABLE) for v in value.values())
+        return dict.copy if flat else copy.deepcopy
+    return copy.deepcopy
+
+
+class _LiteralParser(object):
+    def __init__(self, arrays=False):
+        """
+        Parses single cells. See `literal_parser`.
+        """
+        self.arrays = arrays
+        self._memo = {}
+
+    def parse(self, obj):
+        """
+        Returns the (shared) value parsed from `obj` and the function that
+        copies it for each cell, or None if it may be shared.
+        """
+        if not isinstance(obj, str) or _CANDIDATE.match(obj) is None:
+            return obj, None
+        try:
+            return self._memo[obj]
+        except KeyError:
+            pass
+        try:
+            value = ast.literal_eval(obj)
+        except (ValueError, TypeError, SyntaxError,
+                MemoryError, RecursionError):
+            value = obj
+        else:
+            if self.arrays:
+                value = _as_array(value)
+        result = (value, _copier(value) if value is not obj else None)
+        if len(self._memo) < _MEMO_SIZE:
+            self._memo[obj] = result
+        return result
+
+    def __call__(self, obj):
+        value, copier = self.parse(obj)
+        return value if copier is None else copier(value)
+
+
+def literal_parser(arrays=False):
+    """
+    Returns a function that parses a single cell as `parse_literals`
+    does, remembering (up to 65536 of) the strings it has already parsed.
+    Non-strings are returned unchanged.
+
+    :param arrays: See `parse_literals`.
+    :type arrays: bool
+    :return: Parser, signature: `convert(obj) -> obj`
+    """
+    return _LiteralParser(arrays)
+
+
+def parse_literals(df, arrays=False, parser=None):
+    """
+    Parses cells that hold python-style lists, tuples, dictionaries,
+    numbers, etc., e.g. "[363, 348, 346]", into the python objects they
+    represent. Cells that are not literals are left unchanged.
+
+    Only object (string) columns are examined; numeric, boolean and
+    datetime columns cannot hold such strings and are skipped. Each
+    distinct value of a column is parsed only once, and strings that
+    cannot be literals, judged by their first character, are never passed
+    to `ast.literal_eval`. Columns without literals are left as they are.
+    Repeated mutable results (lists, dicts, sets) are copied so that no
+    two cells share the same object.
+
+    :param df: Table whose cells are to be parsed.
+    :type df: pandas.DataFrame
+    :param arrays: If True, lists or tuples of numbers are stored as
+        read-only float64 numpy arrays, shared between cells with the
+        same text. Default: False.
+    :type arrays: bool
+    :param parser: Parser from `literal_parser`, e.g. to share parsed
+        strings between the chunks of a file. If given, `arrays` is
+        ignored. Default: None, a new parser.
+    :type parser: callable
+    :return: New DataFrame with the parsed cells.
+    :rtype: pandas.DataFrame
+    """
+    parser = literal_parser(arrays) if parser is None else parser
+    result = df.copy(deep=False)
+    for i, dtype in enumerate(df.dtypes):
+        if dtype != object:
+            continue
+        values = df.iloc[:, i]
+        try:
+            codes, uniques = pd.factorize(values, use_na_sentinel=False)
+        except TypeError:
+            # unhashable cells
+            codes, uniques = np.arange(len(values)), values.to_numpy()
+        parsed = [parser.parse(u) for u in uniques]
+        changed = np.fromiter((value is not u for u, (value, _)
+                               in zip(uniques, parsed)),
+                              dtype=bool, count=len(parsed))
+        if not changed.any():
+            continue
+        # only cells that hold literals are replaced; in particular,
+        # non-strings that compare equal, e.g. 1 and True, share a code
+        rows = np.flatnonzero(changed[codes])
+        column = values.to_numpy(dtype=object, copy=True)
+        if all(copier is None for _, copier in parsed):
+            shared = np.empty(len(parsed), dtype=object)
+            for j, (value, _) in enumerate(parsed):
+                shared[j] = value
+            column[rows] = shared[codes[rows]]
+        else:
+            with gc_paused():
+                for j, code in zip(rows.tolist(), codes[rows].tolist()):
+                    value, copier = parsed[code]
+                    column[j] = value if copier is None else copier(value)
+        result.isetitem(i, pd.Series(column, index=df.index).infer_objects())
+    return result
@@ -0,0 +1,322 @@
+from .base import BaseIO
+from .pandas import from_records, literal_parser
+from .util import file_stem, report_collector
+from .. import instrument
+from ..columnar import ColumnStore
+from ..tree import PreorderTree
+from contextlib import nullcontext
+import json
+import numpy as np
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover
+    pa = pq = None
+
+
+# Columns that record the topology and access flags of the nodes
+ID = 'karon.id'
+PARENT = 'karon.parent'
+READABLE = 'karon.readable'
+WRITEABLE = 'karon.writeable'
+_RESERVED = (ID, PARENT, READABLE, WRITEABLE)
+# key of the karon metadata in the Arrow schema
+_METADATA = b'karon'
+
+
+def _literal(value):
+    """
+    Python literal for `value`, which `parse_literals` reads back, or None
+    for None and NaN.
+    """
+    if isinstance(value, np.ndarray):
+        value = value.tolist()
+    elif isinstance(value, np.generic):
+        value = value.item()
+    if value is None or (isinstance(value, float) and value != value):
+        return None
+    return repr(value)
+
+
+def _to_arrow(values):
+    """
+    Converts the values of one attribute, None where a node does not have
+    the attribute, to an Arrow array. Returns the array and whether its
+    cells are python literals (see `parse_literals`) rather than values.
+
+    Numbers, strings and booleans become the corresponding Arrow types;
+    lists, tuples and numpy arrays of numbers become list columns. NaN is
+    kept in float columns but is a missing value (null) in all others.
+    Anything else--dicts, sets, mixed types--is stored as literals.
+    """
+    for from_pandas in (False, True):
+        try:
+            array = pa.array(values, from_pandas=from_pandas)
+        except (pa.ArrowInvalid, pa.ArrowTypeError,
+                pa.ArrowNotImplementedError):
+            continue
+        kind = array.type
+        while pa.types.is_list(kind) or pa.types.is_large_list(kind):
+            kind = kind.value_type
+        if not (pa.types.is_struct(kind) or pa.types.is_map(kind) or
+                pa.types.is_union(kind) or pa.types.is_null(kind)):
+            return array, False
+    return pa.array([_literal(v) for v in values], type=pa.string()), True
+
+
+def _is_vector(kind):
+    """Whether `kind` is a list of numbers."""
+    return (pa.types.is_list(kind) or pa.types.is_large_list(kind)) and \
+        (pa.types.is_floating(kind.value_type) or
+         pa.types.is_integer(kind.value_type))
+
+
+def _vectors(column):
+    """
+    Cells of a list-of-numbers column as read-only float64 arrays that are
+    views into a single buffer. Null cells are None.
+    """
+    array = column.combine_chunks() if isinstance(column, pa.ChunkedArray) \
+        else column
+    offsets = array.offsets.to_numpy()
+    flat = np.ascontiguousarray(
+        array.values.to_numpy(zero_copy_only=False), dtype=float)
+    flat.flags.writeable = False
+    valid = ~array.is_null().to_numpy(zero_copy_only=False)
+    return [flat[offsets[i]:offsets[i + 1]] if valid[i] else None
+            for i in range(len(array))]
+
+
+def _cells(column, literal, parser, arrays):
+    """Python value of each cell of `column`, None for nulls."""
+    if arrays and _is_vector(column.type):
+        return _vectors(column)
+    values = column.to_pylist()
+    if literal:
+        values = [None if v is None else parser(v) for v in values]
+    return values
+
+
+class ParquetIO(BaseIO):
+    """
+    Reads and writes nodes, and the trees they form, as Apache Parquet
+    files, through Apache Arrow tables.
+
+    Each attribute is a column and each node a row. Vector-valued
+    attributes are list columns, and the trees are stored as the row ID of
+    each node (``karon.id``) and of its parent (``karon.parent``). Like
+    `CsvIO`, the generator for the nodes in a file is the one registered
+    under the stem of the file name.
+
+    Requires pyarrow, e.g. ``pip install karon[parquet]``.
+    """
+    def __init__(self, *args, **kwds):
+        if pa is None:
+            raise ImportError("ParquetIO requires pyarrow: "
+                              "pip install karon[parquet]")
+        super().__init__(*args, **kwds)
+
+    def dump(self, fobj, *args, descendants=True, **kwds):
+        """
+        Dumps args (lists of nodes) to a Parquet file.
+
+        Nodes are written in preorder, so that every parent precedes its
+        children. Missing attributes, and NaN in columns that are not
+        float, are written as nulls.
+
+        :param fobj: File to which the nodes are written.
+        :type fobj: str or file-like object
+        :param args: Lists of nodes that are to be written to the file.
+        :type args: list of nodes
+        :param descendants: Whether the descendants of the nodes are also
+            written. Default: True.
+        :type descendants: bool
+        :param kwds: Keywords passed to `pyarrow.parquet.write_table`, e.g.
+            `compression`.
+        :return: None
+        """
+        with instrument.span('ParquetIO.dump', file=str(fobj)):
+            # nodes, in preorder, and their row IDs
+            nodes = []
+            rows = {}
+            for arg in args:
+                for node in arg:
+                    tree = PreorderTree(node) if descendants else (node,)
+                    for n in tree:
+                        if id(n) not in rows:
+                            rows[id(n)] = len(nodes)
+                            nodes.append(n)
+            # attributes, in order of first appearance
+            keys = {}
+            for node in nodes:
+                for key in node.contents:
+                    keys.setdefault(key, None)
+            columns = {}
+            literal = []
+            for key in keys:
+                values = [node.contents.get(key) for node in nodes]
+                columns[key], is_literal = _to_arrow(values)
+                if is_literal:
+                    literal.append(key)
+            columns[ID] = pa.array(np.arange(len(nodes), dtype=np.int64))
+            columns[PARENT] = pa.array(
+                [rows.get(id(n.parent)) if n.parent is not None else None
+                 for n in nodes], type=pa.int64())
+            if all(hasattr(n, 'readable') for n in nodes):
+                columns[READABLE] = pa.array([n.readable() for n in nodes],
+                                             type=pa.bool_())
+                columns[WRITEABLE] = pa.array([n.writeable() for n in nodes],
+                                              type=pa.bool_())
+            table = pa.table(columns)
+            metadata = dict(table.schema.metadata or {})
+            metadata[_METADATA] = json.dumps({'literal': literal}).encode()
+            table = table.replace_schema_metadata(metadata)
+            pq.write_table(table, fobj, **kwds)
+
+    def load(self, fobj, columns=None, columnar=False, arrays=False,
+             report=False):
+        """
+        Loads nodes, and the trees they form, from a Parquet file.
+
+        Attributes that are null for a node are not set. Whole columns are
+        read at a time: for each combination of attributes present, the
+        nodes are created in bulk (see `karon.io.pandas.from_records`),
+        and then linked to their parents.
+
+        :param fobj: File to be read.
+        :type fobj: str or file-like object
+        :param columns: Attributes to be read. Default: all.
+        :type columns: list of str or None
+        :param columnar: If True, the contents of the nodes are rows of a
+            single `karon.columnar.ColumnStore` that is built from the
+            columns of the file, and the nodes are `Sample`s created
+            directly rather than by a generator. Default: False.
+        :type columnar: bool
+        :param arrays: If True, list columns of numbers are read as
+            read-only float64 arrays, views into one buffer per column,
+            rather than as lists. Default: False.
+        :type arrays: bool
+        :param report: See `ExcelIO.load`.
+        :type report: bool or MissingFieldReport
+        :return: Nodes read from the file, parents before their children.
+        :rtype: list of Nodes
+        """
+        with instrument.span('ParquetIO.load', file=str(fobj)):
+            if columns is not None:
+                available = pq.read_schema(fobj).names
+                columns = list(columns) + [k for k in _RESERVED
+                                           if k in available]
+            table = pq.read_table(fobj, columns=columns)
+            metadata = (table.schema.metadata or {}).get(_METADATA)
+            literal = set(json.loads(metadata)['literal']) if metadata \
+                else set()
+            keys = [k for k in table.column_names if k not in _RESERVED]
+            if columnar:
+                nodes = self._columnar(table, keys, literal)
+            else:
+                nodes = self._records(table, fobj, keys, literal, arrays,
+                                      report)
+            self._link(table, nodes)
+        return nodes
+
+    def _records(self, table, fobj, keys, literal, arrays, report):
+        """Creates nodes through the generator. See `load`."""
+        collector, report = report_collector(report)
+        generator = self[file_stem(fobj)]
+        parser = literal_parser(arrays)
+        size = table.num_rows
+        cells = [_cells(table.column(k), k in literal, parser, arrays)
+                 for k in keys]
+        names = [self.schema.intern(k) for k in keys]
+        # nodes with the same attributes are created together
+        if keys:
+            present = np.stack([
+                ~table.column(k).is_null().to_numpy(zero_copy_only=False)
+                for k in keys], axis=1)
+            patterns, groups = np.unique(np.packbits(present, axis=1),
+                                         axis=0, return_inverse=True)
+            groups = groups.reshape(-1)
+        else:
+            present = np.ones((size, 0), dtype=bool)
+            patterns, groups = [None], np.zeros(size, dtype=int)
+        nodes = [None] * size
+        with nullcontext() if collector is None else collector:
+            for group in range(len(patterns)):
+                index = np.flatnonzero(groups == group)
+                if not len(index):
+                    continue
+                columns = np.flatnonzero(present[index[0]])
+                records = [tuple(cells[c][i] for c in columns)
+                           for i in index.tolist()]
+                created = from_records([names[c] for c in columns],
+                                       records, generator)
+                for i, node in zip(index.tolist(), created):
+                    nodes[i] = node
+        if collector is not None and collector is not report:
+            collector.warn()
+        self._flags(table, nodes)
+        return nodes
+
+    def _columnar(self, table, keys, literal):
+        """Creates Samples whose contents are rows of a ColumnStore."""
+        from ..sample import Sample
+
+        parser = literal_parser()
+        size = table.num_rows
+        columns = {}
+        for k in keys:
+            column = table.column(k)
+            valid = ~column.is_null().to_numpy(zero_copy_only=False)
+            if pa.types.is_floating(column.type):
+                # a copy, only because Arrow buffers are immutable
+                values = np.array(column.to_numpy(), dtype=float)
+            else:
+                values = np.empty(size, dtype=object)
+                cells = _cells(column, k in literal, parser,
+                               _is_vector(column.type))
+                for i, value in enumerate(cells):
+                    values[i] = value
+            columns[self.schema.intern(k)] = (values, valid)
+        store = ColumnStore.from_columns(columns, size)
+        nodes = []
+        for row in store.rows():
+            node = Sample()
+            node.contents = row
+            nodes.append(node)
+        self._flags(table, nodes)
+        return nodes
+
+    @staticmethod
+    def _flags(table, nodes):
+        """Sets the readable/writeable flags of the nodes, if stored."""
+        for key, method in ((READABLE, 'readable'), (WRITEABLE, 'writeable')):
+            if key not in table.column_names:
+                continue
+            for node, flag in zip(nodes, table.column(key).to_pylist()):
+                if flag is not None and hasattr(node, method):
+                    getattr(node, method)(flag)
+
+    @staticmethod
+    def _link(table, nodes):
+        """Links each node to its parent, as stored in the file."""
+        if PARENT not in table.column_names:
+            return
+        parents = table.column(PARENT).to_pylist()
+        if ID in table.column_names:
+            ids = table.column(ID).to_pylist()
+        else:
+            ids = list(range(len(nodes)))
+        position = {k: i for i, k in enumerate(ids)}
+        links = [(i, position[p]) for i, p in enumerate(parents)
+                 if p is not None and p in position]
+        if all(parent < child for child, parent in links):
+            # Parents precede their children, as written by `dump`, so
+            # there are no cycles and the check in add_child, which
+            # walks the parent's subtree, is not needed.
+            for child, parent in links:
+                nodes[child]._parent = nodes[parent]
+                nodes[parent]._children.append(nodes[child])
+        else:
+            for child, parent in links:
+                nodes[parent].add_child(nodes[child])
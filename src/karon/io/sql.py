@@ -0,0 +1,146 @@
+from .base import BaseIO
+from .pandas import from_records, literal_parser
+from .util import report_collector
+from .. import instrument
+from contextlib import nullcontext
+
+
+import logging
+_logging = logging.getLogger(__name__)
+
+
+# rows fetched from the database at a time
+_BATCHSIZE = 1000
+
+
+def _quote(name):
+    """Quotes a table name as an SQL identifier, doubling its quotes."""
+    return '"' + name.replace('"', '""') + '"'
+
+
+class SqlIO(BaseIO):
+    """
+    Reads data from SQL tables or queries through any DB-API 2.0
+    connection, e.g. `sqlite3`.
+
+    Rows of a table are passed to the generator registered under the name
+    of the table--"hardness" for ``SELECT * FROM hardness``--just as
+    `ExcelIO` selects the generator by sheet name. Rows of a query are
+    passed to the generator registered under `name`.
+
+    .. code-block :: python
+
+        reader = SqlIO(default=generic, hardness=hardness)
+        with sqlite3.connect('data.db') as connection:
+            nodes = reader.load(connection, ['build', 'hardness'])
+    """
+    def __init__(self, *args, **kwds):
+        super().__init__(*args, **kwds)
+
+    def load(self, connection, tables=None, **kwds):
+        """
+        Loads node data from the specified table(s) or query.
+
+        :param connection: Open DB-API connection.
+        :param tables: Table(s) to be read. See `iter_load`.
+        :type tables: str or list of str
+        :param kwds: See `iter_load`.
+        :return: Nodes read from the table(s) or query.
+        :rtype: list of Nodes
+        """
+        kwds.pop('chunksize', None)
+        with instrument.span('SqlIO.load'):
+            return list(self.iter_load(connection, tables, **kwds))
+
+    def iter_load(self, connection, tables=None, query=None, params=(),
+                  name=None, batchsize=_BATCHSIZE, chunksize=None,
+                  cursor=None, arrays=False, report=False):
+        """
+        Loads node data from the specified table(s) or query lazily, one
+        batch of rows at a time.
+
+        Rows are fetched with `cursor.fetchmany`, so only one batch is held
+        in memory, and the nodes of each batch are created in bulk (see
+        `karon.io.pandas.from_records`). NULL is read as NaN, as are empty
+        cells in `ExcelIO.load` and `CsvIO.load`, so every column is set
+        for every node, and strings that hold lists, tuples, etc. are
+        parsed as in `ExcelIO.load`.
+
+        :param connection: Open DB-API connection.
+        :param tables: Table(s) to be read in full, in order.
+        :type tables: str or list of str
+        :param query: SQL query to be run instead of reading tables.
+        :type query: str
+        :param params: Parameters of `query`, in the paramstyle of the
+            database module.
+        :type params: sequence or dict
+        :param name: Key of the generator for the rows of `query`.
+            Default: None, the default generator.
+        :type name: str
+        :param batchsize: Rows fetched at a time, if `chunksize` is not
+            given. Default: 1000.
+        :type batchsize: int
+        :param chunksize: If given, lists of (at most) this many nodes are
+            yielded rather than single nodes, and rows are fetched this
+            many at a time. Default: None.
+        :type chunksize: int or None
+        :param cursor: Opens the cursor through which rows are read.
+            Default: `connection.cursor()`. Pass a function that opens a
+            server-side cursor, e.g. ``lambda c: c.cursor(name='karon')``
+            for psycopg2, so that results are not held by the client.
+        :type cursor: Function with signature `cursor(connection) -> Cursor`
+        :param arrays: See `ExcelIO.load`.
+        :type arrays: bool
+        :param report: See `ExcelIO.load`. The required/expected keys are
+            checked once per batch.
+        :type report: bool or MissingFieldReport
+        :return: Generator of nodes, or of lists of nodes.
+        """
+        if (tables is None) == (query is None):
+            raise ValueError("Specify either tables or a query.")
+        if query is None:
+            if isinstance(tables, str):
+                tables = [tables]
+            sources = [(table, f"SELECT * FROM {_quote(table)}", ())
+                       for table in tables]
+        else:
+            sources = [(name, query, params)]
+        batchsize = chunksize or batchsize
+        collector, report = report_collector(report)
+        for key, sql, args in sources:
+            generator = self[key]
+            convert = literal_parser(arrays)
+            cur = connection.cursor() if cursor is None else \
+                cursor(connection)
+            try:
+                cur.arraysize = batchsize
+                cur.execute(sql, args)
+                columns = [self.schema.intern(d[0]) for d in cur.description]
+                while True:
+                    rows = cur.fetchmany(batchsize)
+                    if not rows:
+                        break
+                    with instrument.span('SqlIO.batch', table=str(key)):
+                        with nullcontext() if collector is None \
+                                else collector:
+                            nodes = self._create(columns, rows, generator,
+                                                 convert)
+                    if chunksize is None:
+                        yield from nodes
+                    else:
+                        yield nodes
+            finally:
+                cur.close()
+            _logging.debug(f"Read {key or 'query'}.")
+        if collector is not None and collector is not report:
+            collector.warn()
+
+    @staticmethod
+    def _create(columns, rows, generator, convert):
+        """
+        Creates the nodes of a batch of rows, reading NULL as NaN.
+        """
+        nan = float('nan')
+        records = [tuple(nan if v is None else convert(v) for v in row)
+                   for row in rows]
+        return from_records(columns, records, generator)
@@ -0,0 +1,141 @@
+__all__ = ["file_stem", "report_collector", "spool", "to_cell"]
+
+
+from datetime import date, datetime, time, timedelta
+import os
+import pickle
+import tempfile
+import numpy as np
+import pandas as pd
+from ..decorators import MissingFieldReport
+
+
+# rows pickled together while spooling
+_SPOOL_BATCH = 1024
+
+
+def report_collector(report):
+    """
+    Returns the MissingFieldReport to collect into, if any, and the
+    report that was requested, given the `report` option of a reader's
+    `load`: True, False or a MissingFieldReport (see `ExcelIO.load`).
+    """
+    if isinstance(report, MissingFieldReport):
+        return report, report
+    if report:
+        return MissingFieldReport(), report
+    return None, report
+
+
+def file_stem(fobj):
+    """
+    Name of a file without directory or extension, e.g. "hardness" for
+    "data/hardness.csv", which selects the generator for its nodes. None
+    for file-like objects without a name.
+    """
+    name = fobj if isinstance(fobj, (str, os.PathLike)) else \
+        getattr(fobj, 'name', None)
+    if not isinstance(name, (str, os.PathLike)):
+        return None
+    return os.path.splitext(os.path.basename(name))[0]
+
+
+def to_cell(value):
+    """
+    Value that can be stored in a cell and, for lists, tuples, etc., be
+    parsed again by `parse_literals`, e.g. when a file is loaded again.
+    """
+    if value is None or isinstance(value, (str, bool, int)):
+        return value
+    if value is pd.NaT:
+        return None
+    if isinstance(value, float):
+        return None if value != value else value
+    if isinstance(value, np.ndarray):
+        return repr(value.tolist())
+    if isinstance(value, (list, tuple, dict, set, frozenset)):
+        return repr(value)
+    if isinstance(value, np.generic):
+        return to_cell(value.item())
+    if isinstance(value, (datetime, date, time, timedelta)):
+        return value
+    return str(value)
+
+
+def spool(groups, table=None):
+    """
+    Reads groups of nodes once, and returns the columns of each table
+    they are written to and the rows under those columns.
+
+    Writers that stream rows must write the header, i.e. all columns,
+    before the first row, so the nodes would have to be read twice. Groups
+    that can be iterated again, e.g. lists, are read twice. Otherwise, e.g.
+    for generators such as `CsvIO.iter_load`, the rows are buffered in a
+    temporary file while the columns are collected, so that memory use
+    does not grow with the number of nodes.
+
+    :param groups: Groups (lists, generators, etc.) of nodes.
+    :type groups: iterable of iterables of Nodes
+    :param table: Name of the table to which each node is written.
+        Default: None, a single table, None.
+    :type table: Function with signature `table(node) -> str`
+    :return: The columns of each table, in order of first appearance,
+        and an iterator over (table, cells), where the cells (see
+        `to_cell`) follow the columns of the table.
+    :rtype: (dict of str: list of str, iterator of (str, list))
+    """
+    if table is None:
+        def table(node):
+            return None
+    groups = list(groups)
+    columns = {}
+    if all(iter(nodes) is not nodes for nodes in groups):
+        for nodes in groups:
+            for node in nodes:
+                keys = columns.setdefault(table(node), {})
+                for key in node.contents:
+                    keys.setdefault(key, None)
+        columns = {name: list(keys) for name, keys in columns.items()}
+
+        def rows():
+            for nodes in groups:
+                for node in nodes:
+                    name = table(node)
+                    contents = node.contents
+                    yield name, [to_cell(contents.get(key))
+                                 for key in columns[name]]
+
+        return columns, rows()
+    buffer = tempfile.TemporaryFile()
+    try:
+        batch = []
+        for nodes in groups:
+            for node in nodes:
+                name = table(node)
+                keys = columns.setdefault(name, {})
+                for key in node.contents:
+                    keys.setdefault(key, None)
+                batch.append((name, {key: to_cell(value) for key, value
+                                     in node.contents.items()}))
+                if len(batch) == _SPOOL_BATCH:
+                    pickle.dump(batch, buffer, pickle.HIGHEST_PROTOCOL)
+                    batch = []
+        if batch:
+            pickle.dump(batch, buffer, pickle.HIGHEST_PROTOCOL)
+        buffer.seek(0)
+    except BaseException:
+        buffer.close()
+        raise
+    columns = {name: list(keys) for name, keys in columns.items()}
+
+    def spooled():
+        with buffer:
+            while True:
+                try:
+                    batch = pickle.load(buffer)
+                except EOFError:
+                    return
+                for name, cells in batch:
+                    yield name, [cells.get(key) for key in columns[name]]
+
+    return columns, spooled()
@@ -1,13 +1,20 @@
 __all__ = ["OpNode", "as_opnode"]
 
 
+from . import instrument
+from contextlib import nullcontext
 from .tree import Node
 from .tree import (PreorderTree,
                         PostorderTree,
+                        LRNTree,
                         BreadthTree)
 from .tree import empty_like
 
 
+# calls in flight at any one time in `agets` and `aputs`, by default
+_CONCURRENCY = 16
+
+
 class OpNode(Node):
     def __init__(self,
                  contents=None,
@@ -60,6 +67,14 @@ class OpNode(Node):
                 'writeable mask': [boolean mask for writeable nodes]
             }
         """
+        with instrument.timer('_get_nodes') if instrument.enabled() \
+                else nullcontext():
+            return self._build_nodes(order)
+
+    def _build_nodes(self, order: str):
+        """
+        Builds the node lists and masks returned by `_get_nodes`.
+        """
         key = order.lower()
         # list of all nodes
         nodes = {
@@ -108,6 +123,63 @@ class OpNode(Node):
         # done
         return results
 
+    def _iter_nodes(self, order: str, access: str = 'readable'):
+        """
+        Lazily yields the nodes that `_get_nodes` would list under
+        `access` ('readable' or 'writeable') for the same `order`, without
+        building the node lists or the boolean masks first.
+
+        Because an unreadable (unwriteable) node renders its subtree
+        unreadable (unwriteable), a barrier prunes the traversal below it
+        rather than being checked on every descendant.
+
+        :param order, str: Traversal order. See `_get_nodes`.
+        :param access, str: 'readable' or 'writeable'.
+        :return: Generator of nodes.
+        """
+        key = order.lower()
+        if key not in ('preorder', 'postorder', 'breadth', 'children'):
+            raise KeyError(order)
+
+        def allowed(node):
+            return getattr(node, access)()
+
+        def preorder(node):
+            for child in node.children:
+                if allowed(child):
+                    yield child
+                    yield from preorder(child)
+
+        def postorder(node):
+            for child in node.children:
+                if allowed(child):
+                    yield from postorder(child)
+                    yield child
+
+        def breadth(node):
+            generation = [node]
+            while generation:
+                generation = [child
+                              for parent in generation
+                              for child in parent.children
+                              if allowed(child)]
+                yield from generation
+
+        def children(node):
+            for child in node.children:
+                if allowed(child):
+                    yield child
+
+        # the permissions of this node are inherited by its descendants
+        if not allowed(self):
+            return
+        yield from {
+            'preorder': preorder,
+            'postorder': postorder,
+            'breadth': breadth,
+            'children': children
+        }[key](self)
+
     def gets(self,
              func,
              order: str = 'postorder',
@@ -149,11 +221,41 @@ class OpNode(Node):
         :return:
             List of the results of `func` applied to each descendant node.
         """
-        results = [func(n) for n in self._get_nodes(order)['readable']]
-        if callback is not None:
-            callback(self, results)
+        # timers are only created while instrumentation is on
+        enabled = instrument.enabled()
+        with instrument.timer('gets') if enabled else nullcontext():
+            if enabled:
+                func = instrument.timed(func, 'gets.func')
+                if callback is not None:
+                    callback = instrument.timed(callback, 'gets.callback')
+            nodes = self._get_nodes(order)
+            results = [func(n) for n in nodes['readable']]
+            if enabled:
+                _count(nodes, 'readable')
+            if callback is not None:
+                callback(self, results)
         return results
 
+    def igets(self, func, order: str = 'postorder'):
+        """
+        Lazy variant of `gets`. Yields `(node, func(node))` pairs for
+        each readable child node in the requested order as the tree is
+        traversed, so memory use does not grow with the size of the
+        subtree and a consumer that stops early, e.g. after the first
+        match, stops the traversal.
+
+        :param func: "Gets"-like function applied to each child node.
+        :type func: Unary function with signature `func(node: Node) -> object`
+        :param order, str: (optional) The order in which to visit the
+            child nodes. See `gets`. Default: A postorder (LRN tree).
+        :return: Generator of `(node, value)` tuples.
+        """
+        counting = instrument.enabled()
+        for node in self._iter_nodes(order, 'readable'):
+            if counting:
+                instrument.count('nodes visited')
+            yield node, func(node)
+
     def puts(self, func, order: str = 'preorder'):
         """
         Apply a "puts" operation to each child node.
@@ -183,9 +285,99 @@ class OpNode(Node):
             child nodes. Default: A preorder (NLR) tree.
         :return: None
         """
-        for n in self._get_nodes(order)['writeable']:
-            if n.writeable():
-                func(n)
+        enabled = instrument.enabled()
+        with instrument.timer('puts') if enabled else nullcontext():
+            if enabled:
+                func = instrument.timed(func, 'puts.func')
+            nodes = self._get_nodes(order)
+            for n in nodes['writeable']:
+                if n.writeable():
+                    func(n)
+            if enabled:
+                _count(nodes, 'writeable')
+
+    async def agets(self,
+                    func,
+                    order: str = 'postorder',
+                    callback=None,
+                    concurrency: int = _CONCURRENCY):
+        """
+        Coroutine variant of `gets` for I/O-bound "gets" operations, e.g.
+        reading image metadata or querying a database for each node.
+
+        `func` is awaited for every readable node, with at most
+        `concurrency` calls in flight at any one time. The results are
+        returned in the requested traversal order regardless of the
+        order in which the calls complete.
+
+        :param func: Coroutine function applied to each child node.
+        :type func: Unary coroutine function with signature
+            `async func(node: Node) -> object`
+        :param order, str: (optional) The order in which to return the
+            child nodes. See `gets`. Default: A postorder (LRN tree).
+        :param callback: (optional) Signature: `f(node: Node, results)`
+            Function to apply to the list of results. If this returns an
+            awaitable, it is awaited.
+        :type callback: Binary function or coroutine function.
+        :param concurrency, int: (optional) Maximum number of concurrent
+            calls to `func`. None, explicitly, removes the limit.
+            Default: 16.
+        :return:
+            List of the results of `func` applied to each descendant node.
+        """
+        import asyncio
+        import inspect
+
+        semaphore = _semaphore(concurrency)
+
+        async def bounded(node):
+            async with semaphore:
+                return await func(node)
+
+        results = await asyncio.gather(
+            *[bounded(n) for n in self._get_nodes(order)['readable']])
+        results = list(results)
+        if callback is not None:
+            result = callback(self, results)
+            if inspect.isawaitable(result):
+                await result
+        return results
+
+    async def aputs(self,
+                    func,
+                    order: str = 'preorder',
+                    concurrency: int = _CONCURRENCY):
+        """
+        Coroutine variant of `puts` for I/O-bound "puts" operations.
+
+        `func` is awaited for every writeable node, with at most
+        `concurrency` calls in flight at any one time. Calls are started
+        in the requested traversal order, but, unless `concurrency` is 1,
+        a call on a child node may run while the call on its parent is
+        still pending. Use `concurrency=1` if each call depends on the
+        result of the call on the parent node.
+
+        :param func: Coroutine function applied to each child node.
+        :type func: Unary coroutine function with signature
+            `async func(node: Node) -> None`
+        :param order, str: (optional) The order in which to visit the
+            child nodes. See `puts`. Default: A preorder (NLR) tree.
+        :param concurrency, int: (optional) Maximum number of concurrent
+            calls to `func`. None, explicitly, removes the limit.
+            Default: 16.
+        :return: None
+        """
+        import asyncio
+
+        semaphore = _semaphore(concurrency)
+
+        async def bounded(node):
+            async with semaphore:
+                await func(node)
+
+        await asyncio.gather(
+            *[bounded(n) for n in self._get_nodes(order)['writeable']
+              if n.writeable()])
 
     def readable(self, flag: bool = None):
         """
@@ -248,10 +440,74 @@ class OpNode(Node):
             self._writeable = bool(flag)
 
 
-def as_opnode(root):
+def _count(nodes, access):
+    """
+    Counts the nodes visited by a traversal, and the nodes skipped by
+    readable or writeable barriers.
+    """
+    visited = len(nodes['nodes'])
+    instrument.count('nodes visited', visited)
+    instrument.count(f'{access} skipped', visited - len(nodes[access]))
+
+
+def _semaphore(concurrency):
+    """
+    Returns an asynchronous context manager that limits the number of
+    concurrent coroutines to `concurrency`, or does not limit them at
+    all if `concurrency` is None, which callers must pass explicitly.
+    """
+    if concurrency is None:
+        return _Unbounded()
+    if concurrency < 1:
+        raise ValueError("Concurrency must be a positive integer.")
+    import asyncio
+    return asyncio.Semaphore(concurrency)
+
+
+class _Unbounded(object):
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+_upgraded = {}
+
+
+def _upgrade(node):
+    """
+    Rebinds the class of a plain Node, in place, to an OpNode (or, for a
+    Node subclass, to a cached subclass of both OpNode and that class)
+    that is readable and writeable. The contents are not touched.
+    """
+    cls = type(node)
+    if cls not in _upgraded:
+        _upgraded[cls] = OpNode if cls is Node else \
+            type(f"Op{cls.__name__}", (OpNode, cls), {})
+    node.__class__ = _upgraded[cls]
+    node._readable = True
+    node._writeable = True
+
+
+def as_opnode(root, inplace: bool = False):
     """
     Returns the tree defined at root as a tree of Operational Nodes (OpNode).
+
+    :param root: Root of the tree.
+    :param inplace: If True, nodes that are not OpNodes are upgraded in
+        place to readable and writeable OpNodes: no nodes or contents are
+        copied and the tree topology, and references held to its nodes,
+        remain valid. If False (default), a copy of the tree is returned
+        if any node is not an OpNode.
+    :type inplace: bool
+    :return: Root of the tree of OpNodes.
     """
+    if inplace:
+        for node in PreorderTree(root):
+            if not isinstance(node, OpNode):
+                _upgrade(node)
+        return root
     # check if all nodes are already OpNodes
     for node in PreorderTree(root):
         if not isinstance(node, OpNode):
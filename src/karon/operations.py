@@ -0,0 +1,297 @@
+__all__ = ["Aggregate", "Propagate",
+           "aggregate", "propagate",
+           "refresh"]
+
+
+from . import instrument
+from .tree import PreorderTree
+from .tree.util import get
+
+
+def _ancestors(node):
+    """
+    Returns the ancestors of `node`, from its parent to the root.
+    """
+    result = []
+    parent = node.parent
+    while parent is not None:
+        result.append(parent)
+        parent = parent.parent
+    return result
+
+
+def _root(node):
+    """
+    Returns the root of the tree of `node`, and whether `node` is readable
+    from the root, i.e. whether it and all its ancestors are readable.
+    """
+    readable = node.readable()
+    while node.parent is not None:
+        node = node.parent
+        readable = readable and node.readable()
+    return node, readable
+
+
+class Aggregate(object):
+    def __init__(self, key, reduce=None, order: str = 'postorder',
+                 target=None):
+        """
+        Aggregates the values stored at `key` in the readable descendants
+        of a root node and, optionally, reduces them onto the root.
+
+        :param key: Key whose values are collected.
+        :type key: str
+        :param reduce: (optional) Function applied to the list of
+            collected values. See the `callback` in `OpNode.gets`.
+        :type reduce: Binary function, signature: f(Node, list-like)
+        :param order, str: (optional) Traversal order. Default: postorder.
+        :param target: (optional) Key, or keys, that `reduce` writes to
+            the root. Used to order dependent operations, see `Plan`.
+            Default: `key`, if `reduce` is given.
+        :type target: str or tuple of str
+        """
+        self.key = key
+        self.reduce = reduce
+        self.order = order
+        if target is None:
+            target = () if reduce is None else (key,)
+        elif isinstance(target, str):
+            target = (target,)
+        self.target = tuple(target)
+        # values collected by the last aggregation of each root:
+        # {id(root): (root, readable descendants, {id(node): index}, values)}
+        self._collected = {}
+
+    @property
+    def reads(self):
+        return {self.key}
+
+    @property
+    def writes(self):
+        return set(self.target)
+
+    def __repr__(self):
+        targets = ', '.join(map(repr, self.target))
+        return f"aggregate({self.key!r} -> {targets})"
+
+    def __call__(self, root):
+        with instrument.span('aggregate', key=str(self.key)):
+            value = get(self.key)
+            nodes = []
+
+            def collect(node):
+                nodes.append(node)
+                return value(node)
+
+            results = root.gets(collect, order=self.order)
+            if self.reduce is not None:
+                self._collected[id(root)] = (
+                    root, nodes, {id(n): i for i, n in enumerate(nodes)},
+                    list(results))
+                self.reduce(root, results)
+        return results
+
+    def update(self, changed):
+        """
+        Reduces again only the trees in which `key` changed in a readable
+        descendant of the root, or in which `target` changed in the root,
+        and reduces every root in `changed` that was never aggregated.
+
+        The values collected by the last aggregation of a tree are kept,
+        and only those of the changed nodes, found by walking up from each
+        changed node to its root, are collected again. A tree is traversed
+        again only if a changed node was not collected before, e.g. was
+        added since. Nodes that are removed, and access flags that are
+        changed, without changing a key are not detected: apply the
+        operation to the whole tree after such changes.
+
+        :param changed: Changed keys for each node.
+        :type changed: dict, {Node: set of keys}
+        :return: Nodes that may have been modified.
+        :rtype: list
+        """
+        if self.reduce is None:
+            # nothing is written
+            return []
+        value = get(self.key)
+        target = set(self.target)
+        stale = {}
+        reduced = {}
+        for node, keys in iter(changed.items()):
+            if node.parent is None:
+                if id(node) not in self._collected:
+                    # never aggregated, e.g. on the first refresh
+                    stale[id(node)] = node
+                elif target & keys:
+                    # a full aggregation would overwrite the target
+                    reduced[id(node)] = node
+                continue
+            if self.key not in keys:
+                continue
+            root, readable = _root(node)
+            if not readable:
+                # hidden from the root by a read barrier
+                continue
+            collected = self._collected.get(id(root))
+            index = None if collected is None else \
+                collected[2].get(id(node))
+            if index is None:
+                stale[id(root)] = root
+                continue
+            collected[3][index] = value(node)
+            reduced[id(root)] = root
+        with instrument.span('aggregate.update', key=str(self.key)):
+            for root in stale.values():
+                self(root)
+            for key, root in iter(reduced.items()):
+                if key not in stale:
+                    self.reduce(root, list(self._collected[key][3]))
+        return list(stale.values()) + [root for key, root
+                                       in iter(reduced.items())
+                                       if key not in stale]
+
+
+class Propagate(object):
+    def __init__(self, parent_key, child_key=None, overwrite=False):
+        """
+        Propagates `parent_key` from each parent to `child_key` in its
+        writeable children.
+
+        :param parent_key: Key from Node.contents that holds the value to be
+            propagated to the child.
+        :type parent_key: str
+        :param child_key: Key in the child to place the result. By default, is
+            the same as parent_key.
+        :type child_key: str
+        :param overwrite: Whether to overwrite values already present in the
+            children. Default: False.
+        """
+        self.parent_key = parent_key
+        self.child_key = parent_key if child_key is None else child_key
+        self.overwrite = overwrite
+        self.order = 'preorder'
+
+    @property
+    def reads(self):
+        return {self.parent_key, self.child_key}
+
+    @property
+    def writes(self):
+        return {self.child_key}
+
+    def __repr__(self):
+        policy = ", overwrite" if self.overwrite else ""
+        return f"propagate({self.parent_key!r} -> {self.child_key!r}{policy})"
+
+    def put_in_child(self, node):
+        if self.overwrite or (self.child_key not in node.contents):
+            value = node.parent.contents.get(self.parent_key, None)
+            if value is not None:
+                node.contents[self.child_key] = value
+
+    def __call__(self, root):
+        with instrument.span('propagate', key=str(self.parent_key)):
+            root.puts(self.put_in_child)
+
+    def update(self, changed):
+        """
+        Re-propagates only from the nodes in which `parent_key` changed,
+        and from the parents of the nodes in which `child_key` changed,
+        and only to their descendants. A change below another changed
+        node is covered by the propagation from that node.
+
+        :param changed: Changed keys for each node.
+        :type changed: dict, {Node: set of keys}
+        :return: Nodes that may have been modified.
+        :rtype: generator
+        """
+        sources = {}
+        for node, keys in iter(changed.items()):
+            if self.parent_key in keys and node.children:
+                sources[id(node)] = node
+            if self.child_key in keys and node.parent is not None:
+                # a full propagation would overwrite the value
+                sources[id(node.parent)] = node.parent
+        for node in sources.values():
+            ancestors = _ancestors(node)
+            if any(id(a) in sources for a in ancestors):
+                continue
+            # match a full propagation from the root: a write barrier
+            # above this node hides its whole subtree.
+            if not all(a.writeable() for a in ancestors):
+                continue
+            self(node)
+            for descendant in list(PreorderTree(node))[1:]:
+                yield descendant
+
+
+def aggregate(key, reduce=None, order: str = 'postorder', target=None):
+    """
+    Creates an agent that aggregates and, optionally, performs a reduction
+    on values collected from descendant nodes in a tree.
+
+    :return: Aggregate, callable with signature f(tree-like)
+    """
+    return Aggregate(key, reduce=reduce, order=order, target=target)
+
+
+def propagate(parent_key, child_key=None, overwrite=False):
+    """
+    Creates an agent that propagates specific keys from parent to child
+    through the tree.
+
+    :return: Propagate, callable with signature f(tree-like)
+    """
+    return Propagate(parent_key, child_key=child_key, overwrite=overwrite)
+
+
+def _collect(node, changed):
+    try:
+        keys = node.dirty()
+    except AttributeError:
+        return
+    if keys:
+        changed.setdefault(node, set()).update(keys)
+        node.clean()
+
+
+def refresh(roots, operations):
+    """
+    Incrementally applies `operations`, in sequence, to a forest. Nodes
+    record which keys changed since the last refresh (see
+    `Sample.dirty`), and each operation is only re-applied where one of
+    those keys, or a key written by a preceding operation, affects its
+    result: aggregations collect again only the values of the changed
+    descendants, and propagations only reach the descendants of the
+    changed nodes, or of the parents of the changed nodes. Every root is
+    passed to the operations, and aggregations reduce every root they have
+    not aggregated before, so the first refresh of a forest gives the same
+    result as applying every operation in full.
+
+    Example:
+
+        operations = [aggregate("Hv (HV)", reduce=flatten("Hv (HV)")),
+                      propagate("Hv (HV)")]
+        refresh(forest, operations)
+        node.contents["Hv (HV)"] = 363
+        refresh(forest, operations)  # only touches node's tree
+
+    :param roots: Roots of the trees in the forest.
+    :type roots: list of Nodes
+    :param operations: Operations with an `update(changed)` method, e.g.
+        as created by `aggregate` and `propagate`.
+    :type operations: list
+    :return: Keys changed, by node, since the previous refresh, including
+        those written during this refresh.
+    :rtype: dict, {Node: set of keys}
+    """
+    changed = {}
+    for root in roots:
+        for node in PreorderTree(root):
+            _collect(node, changed)
+        # roots are always visited, e.g. to be aggregated the first time
+        changed.setdefault(root, set())
+    for operation in operations:
+        for node in operation.update(changed):
+            _collect(node, changed)
+    return {node: keys for node, keys in iter(changed.items()) if keys}
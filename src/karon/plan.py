@@ -0,0 +1,216 @@
+__all__ = ["Plan"]
+
+
+from . import instrument
+from .operations import Aggregate, Propagate, refresh
+from .tree.util import put
+
+
+def _depends(later, earlier):
+    """
+    Whether operation `later` must run after operation `earlier` has run
+    on the whole tree, i.e. one reads or writes a key the other writes.
+    """
+    return bool((later.reads & earlier.writes) or
+                (later.writes & earlier.reads) or
+                (later.writes & earlier.writes))
+
+
+def _kind(operation):
+    if isinstance(operation, Aggregate):
+        return 'gets'
+    if isinstance(operation, Propagate):
+        return 'puts'
+    raise TypeError(f"Unsupported operation: {operation!r}")
+
+
+class Pass(object):
+    def __init__(self, kind, order):
+        """
+        A single traversal of each tree that applies several
+        independent operations of the same kind.
+
+        :param kind, str: 'gets' (aggregate) or 'puts' (propagate).
+        :param order, str: Traversal order.
+        """
+        self.kind = kind
+        self.order = order
+        self.operations = []
+
+    def __call__(self, root):
+        with instrument.span(f"pass ({self.kind})",
+                             operations=len(self.operations)):
+            self._run(root)
+
+    def _run(self, root):
+        if self.kind == 'gets':
+            operations = self.operations
+            keys = [op.key for op in operations]
+            results = root.gets(
+                lambda node: [node.contents.get(k, None) for k in keys],
+                order=self.order)
+            for i, op in enumerate(operations):
+                if op.reduce is not None:
+                    op.reduce(root, [values[i] for values in results])
+        else:
+            puts = [op.put_in_child for op in self.operations]
+
+            def func(node):
+                for f in puts:
+                    f(node)
+
+            root.puts(func, order=self.order)
+
+    def __repr__(self):
+        access = 'readable' if self.kind == 'gets' else 'writeable'
+        return f"{self.kind} ({self.order}) over {access} nodes"
+
+
+class Plan(object):
+    def __init__(self, *operations):
+        """
+        A declarative recipe of aggregate and propagate operations.
+
+        Operations are declared in the order they would be run by hand.
+        When the plan is run, operations that do not depend on one
+        another--none reads or writes a key that another writes--share a
+        single traversal of each tree, so the whole recipe needs as few
+        postorder (aggregate) and preorder (propagate) passes as possible.
+
+        Example:
+
+            plan = Plan()
+            for attr in attributes:
+                plan.aggregate(attr, reduce=np.mean, target=f"mean {attr}")
+                plan.propagate(f"mean {attr}")
+            print(plan.explain())
+            plan(forest)
+
+        :param operations: (optional) Operations, e.g. from
+            `karon.operations.aggregate` and `karon.operations.propagate`.
+        """
+        self._operations = []
+        self._passes = None
+        for operation in operations:
+            self.add(operation)
+
+    @property
+    def operations(self):
+        return list(self._operations)
+
+    def add(self, operation):
+        """
+        Adds an `Aggregate` or `Propagate` operation to the plan.
+
+        :return: This plan.
+        """
+        _kind(operation)
+        self._operations.append(operation)
+        self._passes = None
+        return self
+
+    def aggregate(self, key, reduce=None, target=None, overwrite=False,
+                  order: str = 'postorder'):
+        """
+        Declares an aggregation of `key` from the readable descendants
+        of each root.
+
+        :param key: Key whose values are collected.
+        :type key: str
+        :param reduce: (optional) Reduction of the collected values, e.g.
+            `numpy.mean`. If None, the values are collected, but not stored.
+        :type reduce: Unary function, signature: f(list-like) -> object
+        :param target: (optional) Key in the root that holds the reduced
+            value. Default: `key`.
+        :type target: str
+        :param overwrite: Whether to overwrite a value already present in
+            the root. Default: False.
+        :param order, str: (optional) Traversal order. Default: postorder.
+        :return: This plan.
+        """
+        target = key if target is None else target
+        if reduce is None:
+            callback = None
+        else:
+            store = put(target, overwrite=overwrite)
+
+            def reduce_into(node, values):
+                store(node, reduce(values))
+
+            callback = reduce_into
+        return self.add(Aggregate(key, reduce=callback, order=order,
+                                  target=target))
+
+    def propagate(self, parent_key, child_key=None, overwrite=False):
+        """
+        Declares a propagation of `parent_key` from each parent to
+        `child_key` in its writeable children.
+
+        :return: This plan.
+        """
+        return self.add(Propagate(parent_key, child_key=child_key,
+                                  overwrite=overwrite))
+
+    def compile(self):
+        """
+        Groups the operations into passes. Each operation is placed in the
+        earliest pass of its kind that follows every pass holding an
+        operation it depends on.
+
+        :return: Passes, in the order they are run.
+        :rtype: list of Pass
+        """
+        if self._passes is not None:
+            return self._passes
+        passes = []
+        placed = []
+        for operation in self._operations:
+            kind = _kind(operation)
+            earliest = 1 + max((i for other, i in placed
+                                if _depends(operation, other)),
+                               default=-1)
+            for i in range(earliest, len(passes)):
+                if (passes[i].kind, passes[i].order) == \
+                        (kind, operation.order):
+                    break
+            else:
+                passes.append(Pass(kind, operation.order))
+                i = len(passes) - 1
+            passes[i].operations.append(operation)
+            placed.append((operation, i))
+        self._passes = passes
+        return passes
+
+    def explain(self):
+        """
+        Describes the passes, and the operations in each pass, that will
+        be run.
+
+        :rtype: str
+        """
+        passes = self.compile()
+        lines = [f"Plan: {len(self._operations)} operations "
+                 f"in {len(passes)} passes"]
+        for i, p in enumerate(passes):
+            lines.append(f"  pass {i + 1}: {p!r}")
+            lines.extend(f"    {op!r}" for op in p.operations)
+        return '\n'.join(lines)
+
+    def __call__(self, roots):
+        """
+        Runs the plan on each tree in a forest.
+
+        :param roots: Roots of the trees in the forest.
+        :type roots: list of Nodes
+        :return: None
+        """
+        for p in self.compile():
+            for root in roots:
+                p(root)
+
+    def refresh(self, roots):
+        """
+        Incrementally re-runs the plan on the parts of the forest that
+        changed since the last refresh. See `karon.operations.refresh`.
+        """
+        return refresh(roots, self._operations)
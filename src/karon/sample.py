@@ -10,21 +10,118 @@
 # subsequent iteration. For now assume an unreadable/unwritable node
 # property extends to all attributes.
 
+from collections.abc import Mapping
 from karon.operational import OpNode
 
 
+class Contents(dict):
+    """
+    Dictionary that records which keys have been set or deleted since
+    it was last marked clean. All keys are dirty on creation.
+    """
+    # Keys changed since the last `clean`, or None while every key present
+    # is dirty, as on creation. The set is only built when first needed,
+    # so that creating many nodes in bulk stays cheap.
+    _dirty = None
+
+    @property
+    def dirty(self):
+        if self._dirty is None:
+            self._dirty = set(self.keys())
+        return self._dirty
+
+    def clean(self, keys=None):
+        """
+        Marks `keys` (default: all keys) as unchanged.
+        """
+        if keys is None:
+            self._dirty = set()
+        else:
+            self.dirty.difference_update(keys)
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        if self._dirty is not None:
+            self._dirty.add(key)
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self.dirty.add(key)
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def update(self, *args, **kwds):
+        for k, v in iter(dict(*args, **kwds).items()):
+            self[k] = v
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def pop(self, key, *default):
+        if key in self:
+            self.dirty.add(key)
+        return super().pop(key, *default)
+
+    def popitem(self):
+        key, value = super().popitem()
+        self.dirty.add(key)
+        return key, value
+
+    def clear(self):
+        self.dirty.update(self.keys())
+        super().clear()
+
+
 class Sample(OpNode):
     def __init__(self, **attributes):
-        readable = attributes.get('readable', True)
-        writeable = attributes.get('writeable', True)
-        if 'readable' in attributes:
-            del attributes['readable']
-        if 'writeable' in attributes:
-            del attributes['writeable']
-        OpNode.__init__(self,
-                        contents=attributes,
-                        readable=readable,
-                        writeable=writeable)
+        readable = attributes.pop('readable', True)
+        writeable = attributes.pop('writeable', True)
+        OpNode.__init__(self, Contents(attributes), readable, writeable)
+
+    @property
+    def contents(self):
+        """
+        Attributes of this sample, a `Contents` dictionary that records
+        which keys changed (see `dirty`).
+
+        A plain dict assigned to `contents` is copied into a new
+        `Contents`, so that changes to it can be tracked: later changes
+        made through the original dict do not reach the sample. Modify
+        `sample.contents` instead, or assign a `Contents` object, which is
+        kept as is.
+        """
+        return self._contents
 
+    @contents.setter
+    def contents(self, value):
+        # Replacing the contents changes every key, old and new.
+        previous = getattr(self, '_contents', None)
+        if isinstance(value, dict) and not isinstance(value, Contents):
+            value = Contents(value)
+        if isinstance(previous, Mapping) and hasattr(value, 'dirty'):
+            value.dirty.update(previous.keys())
+        self._contents = value
 
+    def dirty(self):
+        """
+        Returns the set of keys in this sample's contents that have
+        changed since the last call to `clean`.
+        """
+        try:
+            return set(self._contents.dirty)
+        except AttributeError:
+            return set()
 
+    def clean(self, keys=None):
+        """
+        Marks `keys` (default: all keys) in this sample's contents as
+        unchanged.
+        """
+        try:
+            self._contents.clean(keys)
+        except AttributeError:
+            pass
@@ -0,0 +1,100 @@
+__all__ = ["Schema"]
+
+
+import sys
+
+
+class Schema(object):
+    def __init__(self, names=()):
+        """
+        Registry of attribute names. Each name is interned--every use of
+        the name refers to the same string object, so dictionary lookups
+        with registered names compare by identity rather than by
+        character--and assigned a small integer ID.
+
+        Names derived from a registered name, e.g. "max Hv (HV)" from
+        "Hv (HV)", are built once per (template, name) pair by `derived`
+        rather than once per node.
+
+        Example:
+
+            schema = Schema()
+            key = schema.intern("Heat Wirefeed Speed (mm/s)")
+            schema.id(key)                  # 0
+            schema.name(0) is key           # True
+            schema.derived("max {}", key)   # "max Heat Wirefeed ..."
+
+        :param names: (optional) Names to register.
+        :type names: iterable
+        """
+        self._ids = {}
+        self._names = []
+        self._derived = {}
+        for name in names:
+            self.intern(name)
+
+    def __len__(self):
+        return len(self._names)
+
+    def __iter__(self):
+        return iter(self._names)
+
+    def __contains__(self, name):
+        return name in self._ids
+
+    def intern(self, name):
+        """
+        Registers `name`, if it is not already registered, and returns
+        the canonical object for that name.
+
+        :param name: Attribute name. Strings are interned; other hashable
+            names, e.g. integer column labels, are registered as is.
+        :return: Canonical name.
+        """
+        try:
+            return self._names[self._ids[name]]
+        except KeyError:
+            pass
+        if isinstance(name, str):
+            name = sys.intern(name)
+        self._ids[name] = len(self._names)
+        self._names.append(name)
+        return name
+
+    def id(self, name):
+        """
+        Returns the ID of `name`, registering it if necessary.
+
+        :rtype: int
+        """
+        try:
+            return self._ids[name]
+        except KeyError:
+            self.intern(name)
+            return self._ids[name]
+
+    def name(self, id):
+        """
+        Returns the name registered with `id`.
+        """
+        return self._names[id]
+
+    def derived(self, template, name):
+        """
+        Returns, and registers, the name derived from `name` using
+        `template`, e.g. `derived("max {}", "Hv (HV)")` -> "max Hv (HV)".
+        The derived name is formatted once and reused thereafter.
+
+        :param template: Format string with a single replacement field.
+        :type template: str
+        :param name: Attribute name.
+        :return: Canonical derived name.
+        :rtype: str
+        """
+        key = (template, name)
+        try:
+            return self._derived[key]
+        except KeyError:
+            result = self.intern(template.format(name))
+            self._derived[key] = result
+            return result
@@ -0,0 +1,409 @@
+__all__ = ["ForestStore"]
+
+
+import ast
+from datetime import date, datetime, time
+import sqlite3
+import numpy as np
+import pandas as pd
+from . import instrument
+from .schema import Schema
+from .tree import PreorderTree
+
+
+# How a value is stored in the attributes table
+_PLAIN = 0      # int, float or str, stored as is
+_LITERAL = 1    # python literal, parsed on load
+_NAN = 2        # NaN, which SQLite would store as NULL
+_DATETIME = 3   # datetime or pandas.Timestamp, as ISO 8601 text
+_DATE = 4       # date, as ISO 8601 text
+_TIME = 5       # time, as ISO 8601 text
+_NAT = 6        # pandas.NaT, stored as NULL
+# Types whose repr is a python literal, i.e. parsed by ast.literal_eval
+_LITERALS = (bool, complex, bytes, list, tuple, dict, set, frozenset)
+# Comparisons allowed in a filter
+_OPERATORS = frozenset(('=', '==', '!=', '<>', '<', '<=', '>', '>=',
+                        'LIKE', 'GLOB'))
+# Parameters per query, below SQLite's smallest limit
+_BATCH = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS nodes (
+    id INTEGER PRIMARY KEY,
+    parent INTEGER REFERENCES nodes(id),
+    readable INTEGER NOT NULL DEFAULT 1,
+    writeable INTEGER NOT NULL DEFAULT 1
+);
+CREATE INDEX IF NOT EXISTS nodes_parent ON nodes(parent);
+CREATE TABLE IF NOT EXISTS keys (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS attributes (
+    node INTEGER NOT NULL REFERENCES nodes(id),
+    key INTEGER NOT NULL REFERENCES keys(id),
+    value,
+    kind INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (node, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS attributes_value ON attributes(key, value, node);
+"""
+
+
+def _encode(value):
+    """
+    Returns the (value, kind) stored for an attribute value. Dates and
+    times, e.g. the pandas.Timestamps of a date column read by `ExcelIO`,
+    are stored as ISO 8601 text, which sorts chronologically.
+    """
+    if isinstance(value, np.datetime64):
+        value = pd.Timestamp(value)
+    if value is pd.NaT:
+        return None, _NAT
+    if isinstance(value, datetime):
+        return value.isoformat(), _DATETIME
+    if isinstance(value, date):
+        return value.isoformat(), _DATE
+    if isinstance(value, time):
+        return value.isoformat(), _TIME
+    if hasattr(value, 'tolist') and not isinstance(value, (str, bytes)):
+        # numpy scalars and arrays
+        value = value.tolist()
+    if isinstance(value, bool):
+        return repr(value), _LITERAL
+    if isinstance(value, float) and value != value:
+        return None, _NAN
+    if value is None or isinstance(value, (int, float, str)):
+        return value, _PLAIN
+    if not isinstance(value, _LITERALS):
+        raise TypeError(f"Cannot store a value of type "
+                        f"{type(value).__name__}: {value!r}")
+    return repr(value), _LITERAL
+
+
+def _decode(value, kind):
+    """
+    Returns the attribute value stored as (value, kind). See `_encode`.
+    """
+    if kind == _LITERAL:
+        return ast.literal_eval(value)
+    if kind == _NAN:
+        return float('nan')
+    if kind == _DATETIME:
+        return pd.Timestamp(value)
+    if kind == _DATE:
+        return date.fromisoformat(value)
+    if kind == _TIME:
+        return time.fromisoformat(value)
+    if kind == _NAT:
+        return pd.NaT
+    return value
+
+
+class ForestStore(object):
+    def __init__(self, path=':memory:', generator=None):
+        """
+        Persists forests--nodes, the links between parents and children,
+        and the attributes of each node--in a SQLite database, and
+        queries them without creating a node for every row.
+
+        Subtrees, ancestors and attribute filters are answered by
+        recursive common table expressions over indexed tables, and only
+        the nodes that match are created.
+
+        Example:
+
+            with ForestStore('forest.db') as store:
+                store.add(roots)
+                build, = store.find({'name': 'X'}, ids=True)
+                hard = store.descendants(build, [('Hv (HV)', '>', 300)])
+
+        :param path: SQLite database. Default: in memory.
+        :type path: str
+        :param generator: Creates the nodes returned by queries. Default:
+            `karon.Sample`.
+        :type generator: Function with signature
+            `generator(**contents) -> Node`
+        """
+        self._connection = sqlite3.connect(path)
+        self._connection.executescript(_SCHEMA)
+        # attribute names, whose schema IDs are their IDs in the database
+        self._schema = Schema()
+        for kid, name in self._connection.execute(
+                "SELECT id, name FROM keys ORDER BY id"):
+            if self._schema.id(name) != kid:
+                raise ValueError(f"Key IDs in {path} are not consecutive.")
+        self._generator = generator
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def __len__(self):
+        return self._connection.execute(
+            "SELECT COUNT(*) FROM nodes").fetchone()[0]
+
+    def close(self):
+        self._connection.close()
+
+    def _register(self, names):
+        """
+        Registers attribute names, and stores those that are new. The
+        names are committed on their own, so that the IDs in the schema
+        and in the database stay the same even if adding nodes fails.
+        """
+        stored = len(self._schema)
+        for name in names:
+            self._schema.intern(name)
+        if len(self._schema) > stored:
+            with self._connection:
+                self._connection.executemany(
+                    "INSERT INTO keys (id, name) VALUES (?, ?)",
+                    [(kid, self._schema.name(kid))
+                     for kid in range(stored, len(self._schema))])
+
+    def add(self, roots, parent=None):
+        """
+        Stores trees: the roots and all their descendants.
+
+        :param roots: Root nodes of the trees to be stored.
+        :type roots: iterable of Nodes
+        :param parent: (optional) ID of a stored node under which the
+            roots are added. Default: None, the roots are stored as roots.
+        :type parent: int
+        :return: IDs of the stored nodes, in preorder.
+        :rtype: list of int
+        """
+        with instrument.span('ForestStore.add'):
+            index = {}
+            nodes = []
+            names = {}
+            for root in roots:
+                for node in PreorderTree(root):
+                    if id(node) not in index:
+                        index[id(node)] = len(nodes)
+                        nodes.append(node)
+                        names.update(dict.fromkeys(node.contents))
+            self._register(names)
+            keys = self._schema.id
+            with self._connection:
+                start = self._connection.execute(
+                    "SELECT COALESCE(MAX(id), 0) + 1 FROM nodes").fetchone()[0]
+                ids = {k: start + i for k, i in iter(index.items())}
+
+                def links():
+                    for node in nodes:
+                        up = node.parent
+                        pid = ids.get(id(up), parent) if up is not None \
+                            else parent
+                        readable = node.readable() \
+                            if hasattr(node, 'readable') else True
+                        writeable = node.writeable() \
+                            if hasattr(node, 'writeable') else True
+                        yield ids[id(node)], pid, readable, writeable
+
+                def attributes():
+                    for node in nodes:
+                        nid = ids[id(node)]
+                        for k, v in iter(node.contents.items()):
+                            yield (nid, keys(k)) + _encode(v)
+
+                self._connection.executemany(
+                    "INSERT INTO nodes (id, parent, readable, writeable) "
+                    "VALUES (?, ?, ?, ?)", links())
+                self._connection.executemany(
+                    "INSERT INTO attributes (node, key, value, kind) "
+                    "VALUES (?, ?, ?, ?)", attributes())
+        return [ids[id(node)] for node in nodes]
+
+    def _filter(self, where, alias):
+        """
+        Returns the SQL condition and parameters that select the nodes
+        (column `alias`.id) whose attributes satisfy `where`, or None if
+        a key is not stored, in which case no node can match.
+
+        :param where: Either {key: value} for equality, or (key, operator,
+            value) triples, where operator is one of =, !=, <, <=, >, >=,
+            LIKE and GLOB. All conditions must hold. Numbers are compared
+            only with numbers, strings only with strings, and dates, times
+            and datetimes each only with their own kind. NaN, NaT and None
+            equal themselves, and compare to nothing else.
+        :type where: dict or iterable of tuples
+        """
+        if not where:
+            return "1", []
+        if isinstance(where, dict):
+            where = [(k, '=', v) for k, v in iter(where.items())]
+        clauses = []
+        params = []
+        for key, op, value in where:
+            op = op.upper()
+            if op not in _OPERATORS:
+                raise ValueError(f"Unsupported operator: {op}")
+            if key not in self._schema:
+                return None
+            value, kind = _encode(value)
+            if value is None:
+                # NaN, NaT or None: stored as NULL, which compares to
+                # nothing
+                if op in ('=', '=='):
+                    test = "a.kind = ? AND a.value IS NULL"
+                elif op in ('!=', '<>'):
+                    test = "NOT (a.kind = ? AND a.value IS NULL)"
+                else:
+                    test = "0 AND a.kind = ?"
+                params.extend((self._schema.id(key), kind))
+            else:
+                # SQLite orders all numbers below all strings, so compare
+                # numbers only with numbers and strings with strings
+                if isinstance(value, str):
+                    test = f"a.kind = ? AND typeof(a.value) = 'text' " \
+                           f"AND a.value {op} ?"
+                else:
+                    test = f"a.kind = ? AND typeof(a.value) IN " \
+                           f"('integer', 'real') AND a.value {op} ?"
+                params.extend((self._schema.id(key), kind, value))
+            clauses.append(
+                f"EXISTS (SELECT 1 FROM attributes a WHERE "
+                f"a.node = {alias}.id AND a.key = ? AND {test})")
+        return " AND ".join(clauses), params
+
+    def _query(self, sql, params, ids):
+        """Runs a query for node IDs; returns the IDs or the nodes."""
+        found = [row[0] for row in self._connection.execute(sql, params)]
+        return found if ids else self.get(found)
+
+    def find(self, where=None, ids=False):
+        """
+        Returns the stored nodes whose attributes satisfy `where`.
+
+        :param where: See `descendants`. Default: all nodes.
+        :param ids, bool: Return node IDs rather than nodes.
+        :rtype: list of Nodes or of int
+        """
+        condition = self._filter(where, 'n')
+        if condition is None:
+            return []
+        sql, params = condition
+        return self._query(f"SELECT n.id FROM nodes n WHERE {sql} "
+                           f"ORDER BY n.id", params, ids)
+
+    def roots(self, where=None, ids=False):
+        """
+        Returns the stored nodes that have no parent. See `find`.
+        """
+        condition = self._filter(where, 'n')
+        if condition is None:
+            return []
+        sql, params = condition
+        return self._query(f"SELECT n.id FROM nodes n WHERE n.parent IS NULL "
+                           f"AND {sql} ORDER BY n.id", params, ids)
+
+    def descendants(self, node, where=None, ids=False, inclusive=False):
+        """
+        Returns the descendants of a stored node whose attributes satisfy
+        `where`.
+
+        :param node, int: ID of the stored node.
+        :param where: Either {key: value} for equality, or (key, operator,
+            value) triples, where operator is one of =, !=, <, <=, >, >=,
+            LIKE and GLOB, e.g. [('Hv (HV)', '>', 300)]. All conditions
+            must hold. Default: all descendants.
+        :type where: dict or iterable of tuples
+        :param ids, bool: Return node IDs rather than nodes.
+        :param inclusive, bool: Include `node` itself. Default: False.
+        :return: Matching nodes, ordered by ID, i.e. parents before their
+            children if added together.
+        :rtype: list of Nodes or of int
+        """
+        condition = self._filter(where, 'n')
+        if condition is None:
+            return []
+        sql, params = condition
+        start = "id = ?" if inclusive else "parent = ?"
+        with instrument.span('ForestStore.descendants'):
+            return self._query(
+                f"WITH RECURSIVE subtree(id) AS ("
+                f"SELECT id FROM nodes WHERE {start} "
+                f"UNION ALL "
+                f"SELECT c.id FROM nodes c JOIN subtree s ON c.parent = s.id) "
+                f"SELECT n.id FROM subtree n WHERE {sql} ORDER BY n.id",
+                [node] + params, ids)
+
+    def ancestors(self, node, where=None, ids=False):
+        """
+        Returns the ancestors of a stored node whose attributes satisfy
+        `where` (see `descendants`), nearest first.
+
+        :param node, int: ID of the stored node.
+        :rtype: list of Nodes or of int
+        """
+        condition = self._filter(where, 'n')
+        if condition is None:
+            return []
+        sql, params = condition
+        with instrument.span('ForestStore.ancestors'):
+            return self._query(
+                f"WITH RECURSIVE lineage(id, depth) AS ("
+                f"SELECT parent, 1 FROM nodes "
+                f"WHERE id = ? AND parent IS NOT NULL "
+                f"UNION ALL "
+                f"SELECT p.parent, l.depth + 1 FROM nodes p "
+                f"JOIN lineage l ON p.id = l.id WHERE p.parent IS NOT NULL) "
+                f"SELECT n.id FROM lineage n WHERE {sql} ORDER BY n.depth",
+                [node] + params, ids)
+
+    def parent(self, node):
+        """
+        Returns the ID of the parent of a stored node, or None for a root.
+        """
+        row = self._connection.execute(
+            "SELECT parent FROM nodes WHERE id = ?", (node,)).fetchone()
+        if row is None:
+            raise KeyError(node)
+        return row[0]
+
+    def get(self, ids):
+        """
+        Creates the nodes stored under the given IDs. The nodes are not
+        linked to each other.
+
+        :param ids: IDs of stored nodes.
+        :type ids: iterable of int
+        :return: Nodes, in the order of `ids`.
+        :rtype: list of Nodes
+        """
+        ids = list(ids)
+        if self._generator is None:
+            from .sample import Sample
+            generator = Sample
+        else:
+            generator = self._generator
+        names = self._schema.name
+        contents = {i: {} for i in ids}
+        flags = {}
+        for i in range(0, len(ids), _BATCH):
+            batch = ids[i:i + _BATCH]
+            marks = ", ".join("?" * len(batch))
+            for nid, readable, writeable in self._connection.execute(
+                    f"SELECT id, readable, writeable FROM nodes "
+                    f"WHERE id IN ({marks})", batch):
+                flags[nid] = (bool(readable), bool(writeable))
+            for nid, key, value, kind in self._connection.execute(
+                    f"SELECT node, key, value, kind FROM attributes "
+                    f"WHERE node IN ({marks})", batch):
+                contents[nid][names(key)] = _decode(value, kind)
+        nodes = []
+        for nid in ids:
+            if nid not in flags:
+                raise KeyError(nid)
+            node = generator(**contents[nid])
+            readable, writeable = flags[nid]
+            if hasattr(node, 'readable'):
+                node.readable(readable)
+                node.writeable(writeable)
+            nodes.append(node)
+        return nodes
@@ -2,7 +2,8 @@ __all__ = ["generate_tree", "from_parent"]
 
 
 import warnings
-import numpy as np
+import math
+from .. import instrument
 
 
 def generate_tree(get_nodeid, get_parent, cmp=None):
@@ -35,7 +36,10 @@ def generate_tree(get_nodeid, get_parent, cmp=None):
 
     def is_null(obj):
         try:
-            return np.isnan(obj)
+            return math.isnan(obj)
+        except OverflowError:
+            # int too large for a float
+            return False
         except TypeError:
             return not bool(obj)
 
@@ -51,6 +55,10 @@ def generate_tree(get_nodeid, get_parent, cmp=None):
         :param nodelist: List of nodes to be used to build a tree
         :return:
         """
+        with instrument.span('generate_tree', nodes=len(nodelist)):
+            return _build(nodelist)
+
+    def _build(nodelist):
         roots = []
         for node in nodelist:
             value = get_parent(node)
@@ -125,6 +133,11 @@ def from_parent(nodes, get_key, get_parent):
         def get_parent(node):
             return node.contents.get(parent_str, None)
 
+    with instrument.span('from_parent'):
+        return _from_parent(nodes, get_key, get_parent)
+
+
+def _from_parent(nodes, get_key, get_parent):
     # construct a map of the nodes
     nodemap = {get_key(node): node for node in nodes}
     # construct the trees
@@ -6,6 +6,9 @@ __all__ = ["Node", "BinaryNode", "Tree",
            "empty_like"]
 
 
+from .. import instrument
+
+
 class Node(object):
     def __init__(self, contents: object = None) -> object:
         """
@@ -41,6 +44,8 @@ class Node(object):
         return self._children
 
     def add_child(self, child) -> None:
+        if instrument.enabled():
+            instrument.count('add_child')
         # ensure the child is a Node
         if not isinstance(child, Node):
             raise ValueError("A child must be itself a Node.")
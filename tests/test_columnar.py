@@ -0,0 +1,77 @@
+import numpy as np
+from karon import Sample
+from karon.columnar import ColumnStore, Row
+from karon.operations import aggregate, propagate, refresh
+
+
+def test_column_store():
+    store = ColumnStore(capacity=2)
+    rows = [store.append({'name': name, 'hardness': hv})
+            for name, hv in (('a', 300.), ('b', 320.), ('c', None))]
+    assert len(store) == 3
+    assert dict(rows[0]) == {'name': 'a', 'hardness': 300.}
+    # float columns become object columns when needed
+    values, valid = store.column('hardness')
+    assert values.dtype == object and valid.all()
+    rows[2]['width'] = 2.5
+    values, valid = store.column('width')
+    assert values.dtype == float
+    assert list(valid) == [False, False, True]
+    assert 'width' not in rows[0] and rows[0].get('width', 1) == 1
+    del rows[2]['width']
+    assert 'width' not in rows[2]
+    assert rows[1].copy() == {'name': 'b', 'hardness': 320.}
+
+
+def test_adopt():
+    nodes = [Sample(name='a', hardness=300.), Sample(name='b', vector=(1, 2))]
+    nodes[0].add_child(nodes[1])
+    nodes[0].clean()
+    store = ColumnStore()
+    store.adopt(nodes)
+    assert all(isinstance(n.contents, Row) for n in nodes)
+    assert nodes[0].dirty() == set()
+    assert nodes[1].dirty() == {'name', 'vector'}
+    assert nodes[1].contents['vector'] == (1, 2)
+    # existing get/put code keeps working
+    propagate('hardness')(nodes[0])
+    assert nodes[1].contents['hardness'] == 300.
+    assert 'hardness' in nodes[1].dirty()
+    nodes[0].contents['hardness'] = 330.
+    refresh([nodes[0]], [propagate('hardness', overwrite=True)])
+    assert nodes[1].contents['hardness'] == 330.
+    assert nodes[0].dirty() == nodes[1].dirty() == set()
+    values, valid = store.column('hardness')
+    assert np.all(values == 330.) and valid.all()
+
+
+def test_sample():
+    store = ColumnStore()
+    root = store.sample(name='root', readable=False)
+    child = store.sample(name='child', hardness=310.)
+    root.add_child(child)
+    assert not root.readable()
+    result = aggregate('hardness')(root)
+    assert result == []
+    root.readable(True)
+    assert aggregate('hardness')(root) == [310.]
+
+
+def test_from_columns():
+    hardness = np.array([300., np.nan, 320.])
+    store = ColumnStore.from_columns(
+        {'hardness': (hardness, np.array([True, False, True])),
+         'name': (np.array(['a', 'b', 'c'], dtype=object),
+                  np.ones(3, dtype=bool))}, 3)
+    rows = store.rows()
+    assert [dict(r) for r in rows] == [{'hardness': 300., 'name': 'a'},
+                                       {'name': 'b'},
+                                       {'hardness': 320., 'name': 'c'}]
+    # the columns are not copied
+    assert store.column('hardness')[0].base is hardness
+    rows[1]['hardness'] = 310.
+    assert hardness[1] == 310.
+    store.append({'name': 'd'})
+    assert len(store) == 4 and store.rows()[3]['name'] == 'd'
+    assert len(ColumnStore.from_columns(
+        {'name': (np.empty(0), np.empty(0, dtype=bool))}, 0)) == 0
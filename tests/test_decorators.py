@@ -177,3 +177,90 @@ def test_combinations():
             not result['readable'] and \
             not result['writeable']), \
         "requires + immutable attributes not set as expected."
+
+
+def test_spec():
+    from functools import wraps
+    from karon.decorators import get_spec
+
+    @requires("a", b=1)
+    @expects("b", "c", d=4)
+    @readable
+    def foo(**kwds):
+        return kwds
+
+    spec = get_spec(foo)
+    assert spec.proc.__name__ == 'foo' and spec.name == 'foo'
+    assert spec.defaults == {'readable': True, 'writeable': False,
+                             'b': 1, 'd': 4}
+    # "b" and "d" are always provided by defaults
+    assert spec.checks == [('requires', 'a'), ('expects', 'c')]
+    assert spec.requires == ('a',) and spec.expects == ('c',)
+
+    # a function wrapping a decorated generator has no spec
+    @wraps(foo)
+    def bar(**kwds):
+        return foo(**kwds)
+
+    assert get_spec(bar) is None
+    assert get_spec(lambda **kwds: kwds) is None
+
+
+def test_fused():
+    import inspect
+
+    def depth(**kwds):
+        kwds['depth'] = len(inspect.stack(0))
+        return kwds
+
+    single = readwrite(depth)
+    stacked = readwrite(requires("a")(expects("b", c=3)(immutable(depth))))
+    assert stacked.__name__ == 'depth'
+    with warnings.catch_warnings(record=True) as w:
+        warnings.simplefilter("always")
+        result = stacked(a=1)
+        assert len(w) == 1 and "depth expects b" in str(w[0].message)
+    # one layer, however many decorators are stacked
+    assert result['depth'] == single()['depth']
+    # outermost defaults take precedence
+    assert result['readable'] and result['writeable']
+    assert result['a'] == 1 and result['c'] == 3
+
+    # a check only sees defaults from its own and outer layers
+    @requires("a")
+    @expects(a=1)
+    def inner_default(**kwds):
+        return kwds
+
+    try:
+        inner_default()
+    except RequirementError:
+        pass
+    else:
+        assert False, "Inner defaults must not satisfy outer requirements."
+    assert inner_default(a=2)['a'] == 2
+
+
+def test_missing_field_report():
+    from karon.decorators import MissingFieldReport
+
+    @requires("name")
+    @expects("first", "last")
+    def person(**kwds):
+        return kwds
+
+    with warnings.catch_warnings(record=True) as w:
+        warnings.simplefilter("always")
+        with MissingFieldReport() as report:
+            for _ in range(5):
+                person(name="Bob", first="Bob")
+            person(name="Bob")
+        assert len(w) == 0
+        assert report.counts == {('person', 'last'): 6,
+                                 ('person', 'first'): 1}
+        report.warn()
+        assert len(w) == 1
+        assert "person expects last: missing 6 times" in str(w[0].message)
+        # outside of the report, warnings are issued as before
+        person(name="Bob")
+        assert len(w) == 3
@@ -0,0 +1,47 @@
+import json
+import os
+import subprocess
+import sys
+import karon
+
+
+HEAVY = ('pandas', 'numpy', 'openpyxl', 'pyarrow', 'pkg_resources', 'asyncio')
+
+
+def run(code):
+    """Runs `code` in a fresh interpreter and returns its JSON output."""
+    env = dict(os.environ)
+    path = os.path.dirname(os.path.dirname(karon.__file__))
+    env['PYTHONPATH'] = os.pathsep.join(
+        p for p in (path, env.get('PYTHONPATH')) if p)
+    result = subprocess.run([sys.executable, '-c', code], env=env,
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout)
+
+
+def test_import_is_light():
+    loaded = run(f"""
+import json, sys, time
+start = time.perf_counter()
+import karon, karon.io, karon.plan, karon.decorators
+elapsed = time.perf_counter() - start
+print(json.dumps({{'elapsed': elapsed,
+                  'heavy': [m for m in {HEAVY!r} if m in sys.modules]}}))
+""")
+    assert loaded['heavy'] == []
+    # a few milliseconds in practice; generous for slow test machines
+    assert loaded['elapsed'] < 0.25
+
+
+def test_lazy_backends():
+    loaded = run("""
+import json, sys
+import karon
+version = karon.__version__
+from karon.io import ExcelIO
+print(json.dumps({'version': version, 'pandas': 'pandas' in sys.modules,
+                  'name': ExcelIO.__name__}))
+""")
+    assert isinstance(loaded['version'], str) and loaded['version']
+    assert loaded['pandas']
+    assert loaded['name'] == 'ExcelIO'
@@ -0,0 +1,107 @@
+from karon import instrument
+from karon.instrument import Instrument
+from karon.operational import OpNode
+from karon.tree.build import from_parent
+
+
+def make_tree():
+    #       F
+    #     B   G
+    #    A D   H
+    nodes = {c: OpNode(contents=c) for c in 'ABDFGH'}
+    for parent, child in ('FB', 'BA', 'BD', 'FG', 'GH'):
+        nodes[parent].add_child(nodes[child])
+    return nodes
+
+
+def test_disabled():
+    assert not instrument.enabled()
+    with instrument.timer('nothing') as t:
+        pass
+    assert t._instruments == ()
+
+
+def test_disabled_operations(monkeypatch):
+    # no timers are created while instrumentation is off
+    def timer(name):
+        raise AssertionError(f"timer {name!r} created")
+    monkeypatch.setattr(instrument, 'timer', timer)
+    root = make_tree()['F']
+    assert root.gets(lambda n: n.contents) == ['A', 'D', 'B', 'H', 'G']
+    root.puts(lambda n: None)
+
+
+def test_instrument():
+    with Instrument() as stats:
+        assert instrument.enabled()
+        nodes = make_tree()
+        nodes['G'].readable(False)
+        nodes['B'].writeable(False)
+        root = nodes['F']
+        values = root.gets(lambda n: n.contents, order='preorder',
+                           callback=lambda n, v: None)
+        root.puts(lambda n: None)
+    assert not instrument.enabled()
+    assert values == ['B', 'A', 'D']
+    # 5 to build the tree, 5 for each of the 4 masks built by _get_nodes
+    assert stats.counts['add_child'] == 25
+    assert stats.counts['nodes visited'] == 10
+    assert stats.counts['readable skipped'] == 2
+    assert stats.counts['writeable skipped'] == 3
+    assert stats.calls['gets.func'] == 3
+    assert stats.calls['gets.callback'] == 1
+    assert stats.calls['puts.func'] == 2
+    assert stats.calls['_get_nodes'] == 2
+    assert 0 <= stats.framework_time('gets') <= stats.times['gets']
+    assert 'add_child: 25' in stats.report()
+    # nothing is recorded once the instrument is inactive
+    make_tree()
+    assert stats.counts['add_child'] == 25
+
+
+def test_instrument_tree_building():
+    nodes = [OpNode(contents={'name': 'a'}),
+             OpNode(contents={'name': 'b', 'parent': 'a'})]
+    with Instrument() as stats:
+        roots = from_parent(nodes, get_key='name', get_parent='parent')
+    assert len(roots) == 1
+    assert stats.calls['from_parent'] == 1
+    assert stats.counts['add_child'] == 1
+
+
+def test_tracer(tmp_path):
+    import json
+    from karon import Sample
+    from karon.decorators import readwrite
+    from karon.io.excel import ExcelIO
+    from karon.operations import aggregate
+
+    @readwrite
+    def generic(**contents):
+        return Sample(**contents)
+
+    with instrument.Tracer() as trace:
+        nodes = ExcelIO(default=generic).load('data/example.xlsx')
+        with instrument.span('stage'):
+            roots = from_parent(nodes, 'name', 'parent name')
+            for root in roots:
+                aggregate('modulus (GPa)')(root)
+    names = [e['name'] for e in trace.events]
+    for name in ('ExcelIO.load', 'read_excel', 'ExcelIO.sheet',
+                 'from_parent', 'aggregate', 'stage'):
+        assert name in names
+    sheets = [e['args']['sheet'] for e in trace.events
+              if e['name'] == 'ExcelIO.sheet']
+    assert sheets == ['build', 'mechanical', 'porosity']
+    # chrome trace-event format
+    fname = tmp_path / 'trace.json'
+    trace.dump(str(fname))
+    document = json.loads(fname.read_text())
+    assert all(e['ph'] == 'X' for e in document['traceEvents'])
+    assert len(document['traceEvents']) == len(trace.events)
+    # collapsed stacks
+    lines = trace.collapsed().splitlines()
+    assert any(line.startswith('stage;from_parent ') for line in lines)
+    assert any(line.startswith('ExcelIO.load;ExcelIO.sheet ')
+               for line in lines)
+    assert all(int(line.rsplit(' ', 1)[1]) >= 0 for line in lines)
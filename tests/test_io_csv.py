@@ -0,0 +1,118 @@
+import io
+import warnings
+import numpy as np
+import pandas as pd
+import pytest
+from karon import RequirementError, Sample
+from karon.decorators import readwrite, requires, expects
+from karon.io import CsvIO, ExcelIO
+
+
+@pytest.fixture
+def generic():
+    @readwrite
+    def generic(**contents):
+        return Sample(**contents)
+    return generic
+
+
+@pytest.fixture
+def csv_files(tmp_path):
+    """Writes each sheet of example.xlsx to <sheet>.csv."""
+    paths = []
+    for name, df in pd.read_excel('data/example.xlsx',
+                                  sheet_name=None).items():
+        path = tmp_path / f'{name}.csv'
+        df.to_csv(path, index=False)
+        paths.append(str(path))
+    return paths
+
+
+def test_load(generic, csv_files):
+    calls = []
+
+    @readwrite
+    @requires("modulus (GPa)")
+    def mechanical(**contents):
+        calls.append(contents['name'])
+        return Sample(**contents)
+
+    expected = ExcelIO(default=generic).load('data/example.xlsx')
+    reader = CsvIO(default=generic, mechanical=mechanical)
+    actual = reader.load(csv_files)
+    assert len(actual) == len(expected)
+    for lhs, rhs in zip(actual, expected):
+        assert set(lhs.contents) == set(rhs.contents)
+        assert lhs.contents['name'] == rhs.contents['name']
+    # rows are dispatched by file stem
+    assert len(calls) == 16
+    # a required column is checked once per file
+    with pytest.raises(RequirementError):
+        CsvIO(default=generic, build=mechanical).load(csv_files)
+
+
+def test_iter_load(generic):
+    text = ("name,values,note\n"
+            "a,\"[1, 2, 3]\",plain\n"
+            "b,\"[1, 2, 3]\",\n"
+            "c,\"(4, 5)\",'quoted'\n")
+    stream = CsvIO(default=generic).iter_load(io.StringIO(text), chunksize=2)
+    chunks = list(stream)
+    assert [len(c) for c in chunks] == [2, 1]
+    a, b, c = chunks[0] + chunks[1]
+    assert a.contents['values'] == [1, 2, 3]
+    # repeated strings are parsed once, but not shared
+    assert a.contents['values'] is not b.contents['values']
+    assert c.contents['values'] == (4, 5)
+    assert c.contents['note'] == 'quoted'
+    assert b.contents['note'] != b.contents['note']  # NaN
+    # arrays
+    nodes = CsvIO(default=generic).load(io.StringIO(text), arrays=True)
+    assert isinstance(nodes[0].contents['values'], np.ndarray)
+    assert nodes[0].contents['values'] is nodes[1].contents['values']
+
+    # expected keys are reported once
+    @readwrite
+    @expects("density")
+    def loose(**contents):
+        return Sample(**contents)
+
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter('always')
+        CsvIO(default=loose).load(io.StringIO(text), report=True)
+    assert len(caught) == 1
+
+
+def test_dump(generic, csv_files, tmp_path):
+    nodes = CsvIO(default=generic).load(csv_files)
+    nodes[0].contents['values'] = np.array([1., 2.])
+    fname = str(tmp_path / 'all.csv')
+    CsvIO().dump(fname, nodes[:5], nodes[5:])
+    actual = CsvIO(default=generic).load(fname)
+    assert len(actual) == len(nodes)
+    assert actual[0].contents['values'] == [1., 2.]
+    assert [n.contents['name'] for n in actual] == \
+        [n.contents['name'] for n in nodes]
+    # missing values are empty
+    assert actual[-1].contents['laser power (W)'] != \
+        actual[-1].contents['laser power (W)']
+
+
+def test_dump_stream(generic, csv_files, tmp_path):
+    expected = CsvIO(default=generic).load(csv_files)
+    # the nodes are read once, from a generator
+    fname = str(tmp_path / 'all.csv')
+    CsvIO().dump(fname, CsvIO(default=generic).iter_load(csv_files))
+    actual = CsvIO(default=generic).load(fname)
+    assert len(actual) == len(expected) == 22
+    assert [n.contents['name'] for n in actual] == \
+        [n.contents['name'] for n in expected]
+
+    # columns that first appear late in the stream are written
+    def nodes():
+        yield Sample(name='a')
+        yield Sample(name='b', values=[1, 2])
+
+    out = io.StringIO()
+    CsvIO().dump(out, nodes())
+    assert out.getvalue().splitlines() == ['name,values', 'a,', 'b,"[1, 2]"']
@@ -1,6 +1,6 @@
 import pytest
 from karon import Sample
-from karon.decorators import readwrite, requires
+from karon.decorators import readwrite, requires, expects
 from karon.io.excel import ExcelIO
 from karon.io.pandas import to_dataframe
 
@@ -169,4 +169,421 @@ def test_examples(example_data):
     columns = set()
     for key in ('build columns', 'mechanical columns', 'porosity columns'):
         columns = columns.union(expected[key])
-    assert set(to_dataframe(actual).columns) == columns
\ No newline at end of file
+    assert set(to_dataframe(actual).columns) == columns
+
+
+def test_schema(example_data):
+    from karon.schema import Schema
+
+    @readwrite
+    @requires("name", "parent name")
+    def generic(**contents):
+        return Sample(**contents)
+
+    schema = Schema()
+    reader = ExcelIO(default=generic, schema=schema)
+    assert reader.schema is schema
+    nodes = reader.load(example_data['filename'])
+    for key in example_data['build columns']:
+        assert key in schema
+    names = [k for node in nodes for k in node.contents if k == 'name']
+    assert all(k is schema.name(schema.id('name')) for k in names)
+
+
+def test_arrays(qm_data):
+    import numpy as np
+
+    @readwrite
+    def generic(**contents):
+        return Sample(**contents)
+
+    cell = qm_data['cells'][0]
+    for arrays in (False, True):
+        nodes = ExcelIO(default=generic).load(qm_data['filename'],
+                                              arrays=arrays)
+        node = [n for n in nodes if n.contents['NAME'] == cell['name']][0]
+        value = node.contents[cell['column']]
+        assert np.array_equal(np.asarray(value), cell['value'])
+        if arrays:
+            assert isinstance(value, np.ndarray)
+            assert value.dtype == float and value.flags.c_contiguous
+            assert not value.flags.writeable
+            assert np.asarray(value, dtype=float) is value
+        else:
+            assert isinstance(value, (list, tuple))
+
+
+def test_sheet_validation(example_data):
+    import warnings
+    from karon.decorators import expects
+
+    @readwrite
+    @requires("name")
+    @expects("parent name", "density (g/cc)")
+    def generic(**contents):
+        return Sample(**contents)
+
+    with warnings.catch_warnings(record=True) as w:
+        warnings.simplefilter("always")
+        nodes = ExcelIO(default=generic).load(example_data['filename'])
+    assert len(nodes) == len(example_data['samples'])
+    missing = [str(x.message) for x in w
+               if issubclass(x.category, UserWarning) and
+               "expects" in str(x.message)]
+    # once per sheet
+    assert missing == ["generic expects density (g/cc)"] * 3
+
+
+def test_missing_field_report(example_data):
+    import warnings
+    from karon.decorators import expects, MissingFieldReport
+
+    @readwrite
+    @expects("name", "density (g/cc)")
+    def generic(**contents):
+        return Sample(**contents)
+
+    reader = ExcelIO(default=generic)
+    with warnings.catch_warnings(record=True) as w:
+        warnings.simplefilter("always")
+        report = MissingFieldReport()
+        nodes = reader.load(example_data['filename'], report=report)
+        missing = [x for x in w if "expects" in str(x.message)]
+        assert missing == []
+        assert report.counts == {('generic', 'density (g/cc)'): len(nodes)}
+        reader.load(example_data['filename'], report=True)
+        missing = [x for x in w if "expects" in str(x.message)]
+        assert len(missing) == 1
+        assert f"missing {len(nodes)} times" in str(missing[0].message)
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_load_many(workers):
+    import numpy as np
+
+    @readwrite
+    def generic(**contents):
+        return Sample(**contents)
+
+    reader = ExcelIO(default=generic)
+    files = {'UTEP': 'data/example.xlsx', 'CSM': 'data/generator.xlsx'}
+    expected = []
+    for label, fname in files.items():
+        new = reader.load(fname)
+        for node in new:
+            node.contents['Contact'] = label
+        expected.extend(new)
+    actual = reader.load_many(files, workers=workers, provenance='Contact')
+    assert len(actual) == len(expected)
+    for lhs, rhs in zip(actual, expected):
+        assert set(lhs.contents) == set(rhs.contents)
+        assert str(lhs.contents) == str(rhs.contents)
+    # paths, selected sheets and arrays
+    nodes = reader.load_many(['data/tracking.xlsx'] * 2, workers=workers,
+                             provenance='source', sheet_name='prints',
+                             arrays=True)
+    prints = reader.load('data/tracking.xlsx', sheet_name='prints')
+    assert len(nodes) == 2 * len(prints)
+    assert {n.contents['source'] for n in nodes} == {'data/tracking.xlsx'}
+    arrays = [v for n in nodes for v in n.contents.values()
+              if isinstance(v, np.ndarray)]
+    assert arrays and not any(a.flags.writeable for a in arrays)
+    # sheets selected by name pattern or registered generator
+    import re
+    pattern = re.compile(r'.*\(.*\)')
+    nodes = reader.load_many(['data/tracking.xlsx'], workers=workers,
+                             sheet_name=pattern)
+    assert len(nodes) == len(reader.load('data/tracking.xlsx',
+                                         sheet_name=pattern))
+    registered = ExcelIO(default=generic, prints=generic)
+    nodes = registered.load_many(['data/tracking.xlsx'], workers=workers,
+                                 sheet_name=ExcelIO.REGISTERED)
+    assert len(nodes) == len(reader.load('data/tracking.xlsx',
+                                         sheet_name='prints'))
+    # existing columns are not overwritten
+    with pytest.raises(ValueError):
+        reader.load_many(files, workers=workers, provenance='name')
+
+
+def test_load_many_opens_once(monkeypatch):
+    import pandas as pd
+
+    @readwrite
+    def generic(**contents):
+        return Sample(**contents)
+
+    opened = []
+
+    class ExcelFile(pd.ExcelFile):
+        def __init__(self, path, *args, **kwds):
+            opened.append(path)
+            super().__init__(path, *args, **kwds)
+
+    monkeypatch.setattr(pd, 'ExcelFile', ExcelFile)
+    ExcelIO(default=generic).load_many(['data/tracking.xlsx'], workers=0)
+    assert opened == ['data/tracking.xlsx']
+
+
+def test_iter_load():
+    import types
+
+    @readwrite
+    def generic(**contents):
+        return Sample(**contents)
+
+    reader = ExcelIO(default=generic)
+    for fname in ('data/example.xlsx', 'data/tracking.xlsx'):
+        expected = reader.load(fname)
+        stream = reader.iter_load(fname)
+        assert isinstance(stream, types.GeneratorType)
+        actual = list(stream)
+        assert len(actual) == len(expected)
+        for lhs, rhs in zip(actual, expected):
+            assert set(lhs.contents) == set(rhs.contents)
+            for k, v in rhs.contents.items():
+                w = lhs.contents[k]
+                if isinstance(v, float) and v != v:
+                    assert w != w
+                elif isinstance(v, float):
+                    assert w == pytest.approx(v)
+                else:
+                    assert str(w) == str(v)
+    # chunks
+    chunks = list(reader.iter_load('data/example.xlsx', chunksize=3,
+                                   sheet_name='mechanical'))
+    assert [len(c) for c in chunks] == [3, 3, 3, 3, 3, 1]
+
+
+def test_iter_load_headers(tmp_path):
+    import warnings
+    import openpyxl
+
+    @readwrite
+    @expects("density")
+    def loose(**contents):
+        return Sample(**contents)
+
+    fname = str(tmp_path / 'duplicates.xlsx')
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.append(['x', 'x', 'x.1', 'x'])
+    for i in range(5):
+        sheet.append([i, 10 * i, 100 * i, 1000 * i])
+    workbook.save(fname)
+    reader = ExcelIO(default=loose)
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter('always')
+        expected = reader.load(fname)
+        eager = len(caught)
+        actual = list(reader.iter_load(fname, chunksize=2))
+    # duplicate headers are renamed as by pandas
+    assert list(expected[0].contents)[:4] == ['x', 'x.2', 'x.1', 'x.3']
+    assert [n.contents for n in actual[0]] == \
+        [n.contents for n in expected[:2]]
+    # warned once per sheet, not once per chunk
+    assert eager == 1 and len(caught) == 2
+
+
+def test_cache(tmp_path, monkeypatch):
+    import shutil
+    import numpy as np
+    import pandas as pd
+
+    @readwrite
+    def generic(**contents):
+        return Sample(**contents)
+
+    fname = str(tmp_path / 'tracking.xlsx')
+    shutil.copy('data/tracking.xlsx', fname)
+    cache = tmp_path / 'cache'
+    expected = ExcelIO(default=generic).load(fname, arrays=True)
+    reader = ExcelIO(default=generic, cache=str(cache))
+    first = reader.load(fname, arrays=True)
+    assert len(list(cache.iterdir())) == 1
+
+    # unchanged workbook: neither read nor parsed
+    def fail(*args, **kwds):
+        raise AssertionError("workbook was read")
+    monkeypatch.setattr(pd, 'read_excel', fail)
+    second = reader.load(fname, arrays=True)
+    assert len(first) == len(second) == len(expected)
+    for lhs, rhs in zip(second, expected):
+        assert str(lhs.contents) == str(rhs.contents)
+    arrays = [v for n in second for v in n.contents.values()
+              if isinstance(v, np.ndarray)]
+    assert arrays and not any(a.flags.writeable for a in arrays)
+    # other options are a different entry
+    with pytest.raises(AssertionError):
+        reader.load(fname, arrays=False)
+    monkeypatch.undo()
+    # changed workbook
+    shutil.copy('data/example.xlsx', fname)
+    assert len(reader.load(fname)) == \
+        len(ExcelIO(default=generic).load('data/example.xlsx'))
+    assert len(list(cache.iterdir())) == 2
+
+
+def test_cache_safety(tmp_path, monkeypatch):
+    import os
+    import pickle
+    import pandas as pd
+
+    @readwrite
+    def generic(**contents):
+        return Sample(**contents)
+
+    cache = tmp_path / 'cache'
+    reader = ExcelIO(default=generic, cache=str(cache))
+
+    # failed writes leave no temporary file behind
+    def fail(*args, **kwds):
+        raise pickle.PicklingError("unpicklable")
+    with monkeypatch.context() as m:
+        m.setattr(pickle, 'dump', fail)
+        assert reader.load('data/example.xlsx')
+    assert os.stat(cache).st_mode & 0o777 == 0o700
+    assert list(cache.iterdir()) == []
+    reader.load('data/example.xlsx')
+    assert len(list(cache.iterdir())) == 1
+    # cache directories that others can write to are not read
+    os.chmod(cache, 0o777)
+    read = []
+    monkeypatch.setattr(pd, 'read_excel',
+                        lambda *a, **k: read.append(1) or {})
+    reader.load('data/example.xlsx')
+    assert read
+
+
+def test_selected_sheets(monkeypatch):
+    import re
+    import pandas as pd
+
+    @readwrite
+    def generic(**contents):
+        return Sample(**contents)
+
+    fname = 'data/example.xlsx'
+    everything = ExcelIO(default=generic).load(fname)
+    reader = ExcelIO(default=generic, mechanical=generic)
+    read = []
+    read_excel = pd.read_excel
+
+    def spy(*args, **kwds):
+        read.append(kwds['sheet_name'])
+        return read_excel(*args, **kwds)
+
+    monkeypatch.setattr(pd, 'read_excel', spy)
+    nodes = reader.load(fname, sheet_name=ExcelIO.REGISTERED)
+    assert read == [['mechanical']]
+    assert len(nodes) == 16
+    assert list(reader.deferred) == ['build', 'porosity']
+    assert not reader.deferred.loaded('build')
+    build = reader.deferred['build']
+    assert read == [['mechanical'], ['build']]
+    assert reader.deferred['build'] is build
+    assert len(nodes) + len(build) + len(reader.deferred['porosity']) == \
+        len(everything)
+    # pattern
+    nodes = reader.load(fname, sheet_name=re.compile('b.*|p.*'))
+    assert len(nodes) == 6
+    assert list(reader.deferred) == ['mechanical']
+    with pytest.raises(KeyError):
+        reader.deferred['build']
+    # a sheet named "registered"
+    monkeypatch.undo()
+    nodes = reader.load(fname, sheet_name=['build'])
+    assert str(reader.load(_renamed(fname, 'build', 'registered'),
+                           sheet_name='registered')[0].contents) == \
+        str(nodes[0].contents)
+
+
+def _renamed(fname, old, new):
+    """Copy of workbook `fname`, in memory, with sheet `old` renamed."""
+    import io
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(fname)
+    workbook[old].title = new
+    result = io.BytesIO()
+    workbook.save(result)
+    result.seek(0)
+    return result
+
+
+def test_deferred_sheets(tmp_path, monkeypatch):
+    import pandas as pd
+
+    @readwrite
+    def generic(**contents):
+        return Sample(**contents)
+
+    fname = 'data/example.xlsx'
+    cache = str(tmp_path / 'cache')
+    expected = ExcelIO(default=generic).load(fname, sheet_name=['build'])
+    # file-like objects are returned to where they were
+    with open(fname, 'rb') as ifs:
+        ifs.seek(3)
+        reader = ExcelIO(default=generic, mechanical=generic, cache=cache)
+        reader.load(ifs, sheet_name=ExcelIO.REGISTERED)
+        build = reader.deferred['build']
+        assert ifs.tell() == 3
+    assert [str(n.contents) for n in build] == \
+        [str(n.contents) for n in expected]
+
+    # deferred sheets are cached
+    def fail(*args, **kwds):
+        raise AssertionError("workbook was read")
+
+    monkeypatch.setattr(pd, 'read_excel', fail)
+    reader = ExcelIO(default=generic, mechanical=generic, cache=cache)
+    reader.load(fname, sheet_name=ExcelIO.REGISTERED)
+    assert [str(n.contents) for n in reader.deferred['build']] == \
+        [str(n.contents) for n in expected]
+
+
+def test_stream_dump(tmp_path):
+    import numpy as np
+    import openpyxl
+
+    @readwrite
+    def generic(**contents):
+        return Sample(**contents)
+
+    reader = ExcelIO(default=generic)
+    nodes = reader.load('data/example.xlsx')
+    for node in nodes:
+        node.contents['kind'] = 'parent' if 'laser power (W)' in \
+            node.contents else 'child'
+    nodes[0].contents['values'] = np.array([1., 2.])
+    nodes[1].contents['values'] = (3, 4)
+    # single sheet, with rollover
+    fname = str(tmp_path / 'single.xlsx')
+    reader.dump(fname, nodes[:10], nodes[10:], stream=True, max_rows=8)
+    workbook = openpyxl.load_workbook(fname, read_only=True)
+    assert workbook.sheetnames == ['Sheet1', 'Sheet1 (2)', 'Sheet1 (3)']
+    assert [sum(1 for _ in ws.iter_rows()) for ws in workbook] == [9, 9, 7]
+    workbook.close()
+    actual = ExcelIO(default=generic).load(fname)
+    assert len(actual) == len(nodes)
+    assert actual[0].contents['values'] == [1., 2.]
+    assert actual[1].contents['values'] == (3, 4)
+    for lhs, rhs in zip(actual, nodes):
+        assert lhs.contents['name'] == rhs.contents['name']
+    # one sheet per kind
+    fname = str(tmp_path / 'kinds.xlsx')
+    reader.dump(fname, nodes, stream=True, sheet='kind')
+    actual = ExcelIO(default=generic).load(fname, sheet_name=None)
+    assert {n.contents['kind'] for n in actual} == {'parent', 'child'}
+    workbook = openpyxl.load_workbook(fname, read_only=True)
+    assert workbook.sheetnames == ['parent', 'child']
+    header = next(workbook['parent'].iter_rows(values_only=True))
+    assert 'laser power (W)' in header and 'modulus (GPa)' not in header
+    workbook.close()
+    # the nodes are read once, so they can come from a generator
+    fname = str(tmp_path / 'streamed.xlsx')
+    reader.dump(fname, reader.iter_load('data/example.xlsx'), stream=True,
+                max_rows=8)
+    actual = ExcelIO(default=generic).load(fname)
+    assert len(actual) == 22
+    assert [n.contents['name'] for n in actual] == \
+        [n.contents['name'] for n in reader.load('data/example.xlsx')]
@@ -0,0 +1,114 @@
+import gc
+import threading
+import warnings
+import pandas as pd
+import pytest
+from karon import RequirementError, Sample
+from karon.decorators import readwrite, requires, expects, immutable
+from karon.io.base import gc_paused
+from karon.io.pandas import from_dataframe, to_dataframe
+
+
+@pytest.fixture
+def frame():
+    return pd.DataFrame({'name': ['a', 'b', 'c'],
+                         'hardness': [300, 320, None],
+                         'readable': [True, False, True]})
+
+
+def test_from_dataframe(frame):
+    @readwrite
+    @requires("name", width=2)
+    @expects("hardness")
+    def generic(**contents):
+        return Sample(**contents)
+
+    expected = [generic(**row) for _, row in frame.iterrows()]
+    actual = from_dataframe(frame, generic)
+    assert len(actual) == len(expected)
+    for lhs, rhs in zip(actual, expected):
+        assert set(lhs.contents) == set(rhs.contents) == \
+            {'name', 'hardness', 'width'}
+        assert lhs.contents['width'] == 2
+        assert lhs.readable() == rhs.readable()
+        assert lhs.writeable() and rhs.writeable()
+    assert [n.readable() for n in actual] == [True, False, True]
+    # round trip
+    assert list(to_dataframe(actual)['name']) == ['a', 'b', 'c']
+
+
+def test_from_dataframe_checks(frame):
+    @immutable
+    @requires("length")
+    def strict(**contents):
+        return Sample(**contents)
+
+    with pytest.raises(RequirementError):
+        from_dataframe(frame, strict)
+    # nothing to validate in an empty sheet
+    assert from_dataframe(frame.iloc[:0], strict) == []
+
+    @expects("length")
+    def lenient(**contents):
+        return Sample(**contents)
+
+    with warnings.catch_warnings(record=True) as w:
+        warnings.simplefilter("always")
+        nodes = from_dataframe(frame, lenient)
+    # one warning for the sheet, not one per row
+    assert len(nodes) == 3 and len(w) == 1
+    assert "length" in str(w[0].message)
+    # plain functions are called once per row
+    nodes = from_dataframe(frame, lambda **row: Sample(**row))
+    assert [n.readable() for n in nodes] == [True, False, True]
+
+
+def test_parse_literals():
+    import ast
+    import numpy as np
+    from karon.io.pandas import parse_literals
+
+    def reference(obj):
+        try:
+            return ast.literal_eval(obj)
+        except (ValueError, SyntaxError):
+            return obj
+
+    cells = ['[1, 2]', '(3, 4)', "{'a': 1}", '12', '-1.5', '.5', ' 7',
+             'True', 'None', "'quoted'", "b'raw'", 'plain', 'inf', 'nan',
+             '[1, 2', 'Ti-6Al-4V', '', '1e3', '[1, 2]', 'set()',
+             '\n[1, 2]', '\r\n(5,)', 'None of these']
+    df = pd.DataFrame({'text': cells,
+                       'number': np.arange(len(cells), dtype=float),
+                       'flag': [True] * len(cells)})
+    actual = parse_literals(df)
+    expected = df.applymap(reference)
+    assert list(actual['text']) == list(expected['text'])
+    assert actual['number'].dtype == float
+    assert actual['flag'].dtype == bool
+    # the input is not modified
+    assert df['text'][0] == '[1, 2]'
+    # repeated mutable values are not shared
+    assert actual['text'][0] == actual['text'][18]
+    assert actual['text'][0] is not actual['text'][18]
+    # repeated arrays are shared and read-only
+    arrays = parse_literals(df, arrays=True)['text']
+    assert isinstance(arrays[0], np.ndarray) and arrays[0] is arrays[18]
+    assert not arrays[0].flags.writeable
+
+
+def test_gc_paused():
+    assert gc.isenabled()
+    with gc_paused():
+        assert not gc.isenabled()
+    assert gc.isenabled()
+    # the collector is shared by all threads: not paused while others run
+    done = threading.Event()
+    thread = threading.Thread(target=done.wait)
+    thread.start()
+    try:
+        with gc_paused():
+            assert gc.isenabled()
+    finally:
+        done.set()
+        thread.join()
@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+from karon import RequirementError, Sample
+from karon.decorators import readwrite, requires
+from karon.tree import PreorderTree
+from karon.tree.build import from_parent
+
+pytest.importorskip('pyarrow')
+from karon.io import ExcelIO, ParquetIO  # noqa: E402
+
+
+@pytest.fixture
+def generic():
+    @readwrite
+    def generic(**contents):
+        return Sample(**contents)
+    return generic
+
+
+@pytest.fixture
+def forest(generic):
+    nodes = ExcelIO(default=generic).load('data/example.xlsx')
+    roots = from_parent(nodes, 'name', 'parent name')
+    nodes[0].contents['vector'] = np.array([1., 2., 3.])
+    nodes[1].contents['vector'] = (4, 5)
+    nodes[2].contents['table'] = {'a': 1, 'b': [2, 3]}
+    nodes[3].contents['mixed'] = 'x'
+    nodes[4].contents['mixed'] = 1.5
+    nodes[-1].readable(False)
+    return roots
+
+
+def shape(roots):
+    return sorted((len(list(PreorderTree(r))), r.contents['name'])
+                  for r in roots)
+
+
+def test_round_trip(generic, forest, tmp_path):
+    fname = str(tmp_path / 'forest.parquet')
+    ParquetIO().dump(fname, forest)
+    expected = [n for r in forest for n in PreorderTree(r)]
+    nodes = ParquetIO(default=generic).load(fname)
+    assert len(nodes) == len(expected)
+    roots = [n for n in nodes if n.parent is None]
+    assert shape(roots) == shape(forest)
+    for lhs, rhs in zip(nodes, expected):
+        assert lhs.readable() == rhs.readable()
+        for k, v in rhs.contents.items():
+            if isinstance(v, str) or not (isinstance(v, float) and v != v):
+                w = lhs.contents[k]
+                if isinstance(v, (np.ndarray, tuple)):
+                    assert list(w) == list(v)
+                else:
+                    assert w == v
+            elif k == 'parent name':
+                # NaN in a string column is missing
+                assert k not in lhs.contents
+    # vectors as views into one buffer
+    nodes = ParquetIO(default=generic).load(fname, arrays=True)
+    vector = [n.contents['vector'] for n in nodes if 'vector' in n.contents]
+    assert all(isinstance(v, np.ndarray) and not v.flags.writeable
+               for v in vector)
+    assert vector[0].base is vector[1].base
+    # selected columns
+    nodes = ParquetIO(default=generic).load(fname, columns=['name'])
+    assert all(set(n.contents) == {'name'} for n in nodes)
+    assert shape([n for n in nodes if n.parent is None]) == shape(forest)
+
+
+def test_generators(generic, forest, tmp_path):
+    fname = str(tmp_path / 'mechanical.parquet')
+    ParquetIO().dump(fname, forest)
+
+    @readwrite
+    @requires('modulus (GPa)')
+    def mechanical(**contents):
+        return Sample(**contents)
+
+    with pytest.raises(RequirementError):
+        ParquetIO(mechanical=mechanical).load(fname)
+
+
+def test_columnar(generic, forest, tmp_path):
+    fname = str(tmp_path / 'forest.parquet')
+    ParquetIO().dump(fname, forest)
+    nodes = ParquetIO().load(fname, columnar=True)
+    expected = ParquetIO(default=generic).load(fname)
+    store = nodes[0].contents.store
+    assert all(n.contents.store is store for n in nodes)
+    for lhs, rhs in zip(nodes, expected):
+        assert set(lhs.contents) == set(rhs.contents)
+        assert str(lhs.contents['name']) == str(rhs.contents['name'])
+    values, valid = store.column('modulus (GPa)')
+    assert values.dtype == float and valid.sum() == 16
+    # writeable
+    nodes[0].contents['modulus (GPa)'] = 1.
+    assert store.column('modulus (GPa)')[0][0] == 1.
+    assert shape([n for n in nodes if n.parent is None]) == shape(forest)
@@ -0,0 +1,106 @@
+import sqlite3
+import warnings
+import numpy as np
+import pytest
+from karon import RequirementError, Sample
+from karon.decorators import readwrite, requires, expects
+from karon.io import SqlIO
+
+
+@pytest.fixture
+def generic():
+    @readwrite
+    def generic(**contents):
+        return Sample(**contents)
+    return generic
+
+
+@pytest.fixture
+def connection():
+    connection = sqlite3.connect(':memory:')
+    connection.executescript("""
+        CREATE TABLE build (name TEXT, "laser power (W)" REAL);
+        CREATE TABLE hardness (name TEXT, "Hv (HV)" REAL, "values" TEXT);
+        INSERT INTO build VALUES ('B1', 200.0), ('B2', NULL);
+    """)
+    connection.executemany(
+        "INSERT INTO hardness VALUES (?, ?, ?)",
+        [(f'S{i}', 250.0 + i, '[1, 2, 3]') for i in range(25)])
+    yield connection
+    connection.close()
+
+
+def test_load(generic, connection):
+    calls = []
+
+    @readwrite
+    @requires("Hv (HV)")
+    def hardness(**contents):
+        calls.append(contents['name'])
+        return Sample(**contents)
+
+    reader = SqlIO(default=generic, hardness=hardness)
+    nodes = reader.load(connection, ['build', 'hardness'])
+    assert [n.contents['name'] for n in nodes] == \
+        ['B1', 'B2'] + [f'S{i}' for i in range(25)]
+    # rows are dispatched by table name
+    assert len(calls) == 25
+    # NULL is NaN, as empty cells are in Excel or CSV files
+    assert nodes[0].contents['laser power (W)'] == 200.
+    assert np.isnan(nodes[1].contents['laser power (W)'])
+    # literals are parsed, but not shared
+    assert nodes[2].contents['values'] == [1, 2, 3]
+    assert nodes[2].contents['values'] is not nodes[3].contents['values']
+    # a required column is checked
+    with pytest.raises(RequirementError):
+        SqlIO(default=generic, build=hardness).load(connection, 'build')
+
+    # ...and is present when NULL
+    @readwrite
+    @requires("laser power (W)")
+    def build(**contents):
+        return Sample(**contents)
+
+    nodes = SqlIO(default=generic, build=build).load(connection, 'build')
+    assert [n.contents['name'] for n in nodes] == ['B1', 'B2']
+    with pytest.raises(ValueError):
+        reader.load(connection)
+
+
+def test_iter_load(generic, connection):
+    reader = SqlIO(default=generic)
+    # queries, in batches
+    chunks = list(reader.iter_load(
+        connection, query='SELECT name, "Hv (HV)" FROM hardness '
+                          'WHERE "Hv (HV)" >= ?',
+        params=(260,), chunksize=10))
+    assert [len(c) for c in chunks] == [10, 5]
+    assert chunks[1][-1].contents == {'name': 'S24', 'Hv (HV)': 274.}
+    # rows are fetched in batches
+    fetched = []
+
+    class Cursor(sqlite3.Cursor):
+        def fetchmany(self, size=None):
+            fetched.append(size)
+            return super().fetchmany(size)
+
+    stream = reader.iter_load(connection, 'hardness', batchsize=8,
+                              cursor=lambda c: c.cursor(Cursor))
+    assert next(stream).contents['name'] == 'S0'
+    assert fetched == [8]
+    assert len(list(stream)) == 24
+    assert fetched == [8, 8, 8, 8, 8]
+    # arrays
+    nodes = reader.load(connection, 'hardness', arrays=True)
+    assert isinstance(nodes[0].contents['values'], np.ndarray)
+
+    # expected keys are reported once
+    @readwrite
+    @expects("density")
+    def loose(**contents):
+        return Sample(**contents)
+
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter('always')
+        SqlIO(default=loose).load(connection, 'hardness', report=True)
+    assert len(caught) == 1
@@ -1,5 +1,6 @@
 import pytest
-from karon.operational import OpNode
+from karon.operational import OpNode, as_opnode
+from karon.tree import Node
 from karon.tree import (PreorderTree,
                         PostorderTree,
                         InorderTree,
@@ -223,3 +224,132 @@ def test_puts(initialize):
     result = ''.join([n.contents for n in PostorderTree(root)])
     expected = 'ABCDEDDBBFIHHGGFF'
     assert result == expected
+
+
+def test_agets(initialize):
+    import asyncio
+    root = initialize['root']
+    for node in PreorderTree(root):
+        if node.contents == 'G':
+            node.readable(False)
+    active = {'now': 0, 'max': 0}
+
+    async def upper(node):
+        active['now'] += 1
+        active['max'] = max(active['max'], active['now'])
+        # later nodes finish first to check that order is preserved
+        await asyncio.sleep(0.001 * (ord('J') - ord(node.contents)))
+        active['now'] -= 1
+        return node.contents.upper()
+
+    reduced = {}
+
+    async def callback(node, results):
+        reduced[node.contents] = ''.join(results)
+
+    results = asyncio.run(root.agets(upper,
+                                     order='preorder',
+                                     callback=callback,
+                                     concurrency=2))
+    assert ''.join(results) == 'BADCE'
+    assert reduced == {'F': 'BADCE'}
+    assert active['max'] == 2
+    expected = ''.join(root.gets(lambda n: n.contents.upper(),
+                                 order='postorder'))
+    results = asyncio.run(root.agets(upper))
+    assert ''.join(results) == expected
+    # bounded by default, unbounded only on request
+    wide = OpNode(contents='root')
+    for i in range(40):
+        wide.add_child(OpNode(contents=i))
+    active = {'now': 0, 'max': 0}
+
+    async def track(node):
+        active['now'] += 1
+        active['max'] = max(active['max'], active['now'])
+        await asyncio.sleep(0.001)
+        active['now'] -= 1
+
+    asyncio.run(wide.agets(track, order='children'))
+    assert active['max'] == 16
+    active['max'] = 0
+    asyncio.run(wide.aputs(track, order='children', concurrency=None))
+    assert active['max'] == 40
+
+
+def test_aputs(initialize):
+    import asyncio
+    root = initialize['root']
+    for node in PreorderTree(root):
+        if node.contents == 'D':
+            node.writeable(False)
+    visited = []
+
+    async def mark(node):
+        visited.append(node.contents)
+        await asyncio.sleep(0)
+        node.contents = node.contents.lower()
+
+    asyncio.run(root.aputs(mark, concurrency=1))
+    assert ''.join(visited) == 'BAGHI'
+    result = ''.join([n.contents for n in PreorderTree(root)])
+    assert result == 'FbaDCEghi'
+
+
+def test_igets(initialize):
+    root = initialize['root']
+    for node in PreorderTree(root):
+        if node.contents == 'D':
+            node.readable(False)
+        if node.contents == 'H':
+            node.readable(False)
+    for order in ('preorder', 'postorder', 'breadth', 'children'):
+        expected = root.gets(lambda n: n.contents.lower(), order=order)
+        pairs = list(root.igets(lambda n: n.contents.lower(), order=order))
+        assert [v for _, v in pairs] == expected, order
+        assert all(n.contents.lower() == v for n, v in pairs)
+    # early exit stops the traversal
+    visited = []
+
+    def record(node):
+        visited.append(node.contents)
+        return node.contents
+
+    first = next(v for _, v in root.igets(record, order='preorder')
+                 if v == 'A')
+    assert first == 'A'
+    assert ''.join(visited) == 'BA'
+    # an unreadable root hides all of its descendants
+    root.readable(False)
+    assert list(root.igets(record)) == root.gets(record) == []
+
+
+def test_as_opnode():
+    def mixed():
+        root = Node({'name': 'root'})
+        child = OpNode({'name': 'child'}, readable=False)
+        grandchild = Node({'name': 'grandchild'})
+        root.add_child(child)
+        child.add_child(grandchild)
+        return root, child, grandchild
+
+    # copy
+    root, child, grandchild = mixed()
+    copy = as_opnode(root)
+    assert copy is not root and not isinstance(root, OpNode)
+    assert [n.contents for n in PreorderTree(copy)] == \
+        [n.contents for n in PreorderTree(root)]
+    assert not copy.children[0].readable()
+    assert as_opnode(copy) is copy
+    # in place
+    root, child, grandchild = mixed()
+    contents = grandchild.contents
+    upgraded = as_opnode(root, inplace=True)
+    assert upgraded is root
+    assert all(isinstance(n, OpNode) for n in PreorderTree(root))
+    assert root.children[0] is child and child.children[0] is grandchild
+    assert grandchild.contents is contents
+    assert grandchild.parent is child
+    assert root.readable() and grandchild.writeable()
+    assert not child.readable()
+    assert root.gets(lambda n: n.contents['name']) == []
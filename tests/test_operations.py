@@ -0,0 +1,165 @@
+import pytest
+from karon import Sample
+from karon.operations import aggregate, propagate, refresh
+from karon.tree import PreorderTree
+
+
+def make_forest():
+    #   a          x
+    #   b  e       y
+    #  c d
+    nodes = {name: Sample(name=name) for name in 'abcdexy'}
+    nodes['a'].add_child(nodes['b'])
+    nodes['a'].add_child(nodes['e'])
+    nodes['b'].add_child(nodes['c'])
+    nodes['b'].add_child(nodes['d'])
+    nodes['x'].add_child(nodes['y'])
+    nodes['c'].contents['hardness'] = 300
+    nodes['d'].contents['hardness'] = 320
+    nodes['y'].contents['hardness'] = 280
+    return [nodes['a'], nodes['x']], nodes
+
+
+@pytest.fixture
+def operations():
+    calls = []
+
+    def total(node, values):
+        calls.append(node.contents['name'])
+        node.contents['total'] = sum(v for v in values if v is not None)
+
+    return calls, [aggregate('hardness', reduce=total, target='total'),
+                   propagate('total', overwrite=True)]
+
+
+def snapshot(roots):
+    return [dict(n.contents) for root in roots for n in PreorderTree(root)]
+
+
+def test_contents_dirty():
+    sample = Sample(name='a', readable=False)
+    assert sample.dirty() == {'name'}
+    sample.clean()
+    assert sample.dirty() == set()
+    sample.contents['hardness'] = 300
+    sample.contents.update(width=2)
+    sample.contents.pop('name')
+    assert sample.dirty() == {'hardness', 'width', 'name'}
+    sample.clean(['width'])
+    assert sample.dirty() == {'hardness', 'name'}
+    sample.contents = {'length': 1}
+    assert sample.dirty() == {'hardness', 'width', 'length'}
+
+
+def test_refresh(operations):
+    calls, ops = operations
+    roots, nodes = make_forest()
+    refresh(roots, ops)
+    assert sorted(calls) == ['a', 'x']
+    assert nodes['a'].contents['total'] == 620
+    assert nodes['c'].contents['total'] == 620
+    assert nodes['y'].contents['total'] == 280
+    # nothing changed, nothing to do
+    del calls[:]
+    assert refresh(roots, ops) == {}
+    assert calls == []
+    # a single correction only refreshes its own tree
+    nodes['d'].contents['hardness'] = 330
+    changed = refresh(roots, ops)
+    assert calls == ['a']
+    assert nodes['d'] in changed and nodes['y'] not in changed
+    # matches a full recomputation
+    expected, full = make_forest()
+    for op in ops:
+        for root in expected:
+            op(root)
+    full['d'].contents['hardness'] = 330
+    for op in ops:
+        for root in expected:
+            op(root)
+    assert snapshot(roots) == snapshot(expected)
+
+
+def full_pass(ops, edit):
+    """Applies `ops` in full, then `edit`, then `ops` in full again."""
+    roots, nodes = make_forest()
+    for op in ops:
+        for root in roots:
+            op(root)
+    edit(nodes)
+    for op in ops:
+        for root in roots:
+            op(root)
+    return roots
+
+
+def test_first_refresh_matches_full_pass(operations):
+    _, ops = operations
+
+    def count(node, values):
+        node.contents['n'] = len(values)
+
+    ops = ops + [aggregate('hardness', reduce=count, target='n')]
+    # no key is dirty, e.g. after an earlier, unrelated refresh
+    roots, nodes = make_forest()
+    for node in nodes.values():
+        node.clean()
+    refresh(roots, ops)
+    assert nodes['a'].contents['n'] == 4
+    assert snapshot(roots) == snapshot(full_pass(ops, lambda nodes: None))
+    # a lone root, with nothing below it
+    root = Sample(name='a', h=1)
+    refresh([root], [aggregate('h', reduce=count, target='n')])
+    assert root.contents['n'] == 0
+
+
+@pytest.mark.parametrize('name,value', [('a', 1), ('b', 1), ('c', 5)])
+def test_refresh_matches_full_pass(operations, name, value):
+    _, ops = operations
+
+    def edit(nodes):
+        nodes[name].contents['total'] = value
+
+    roots, nodes = make_forest()
+    refresh(roots, ops)
+    edit(nodes)
+    refresh(roots, ops)
+    assert nodes['c'].contents['total'] == 620
+    assert snapshot(roots) == snapshot(full_pass(ops, edit))
+
+
+def test_refresh_aggregate_walks_up(operations):
+    calls, ops = operations
+    roots, nodes = make_forest()
+    refresh(roots, ops)
+    # changed values are collected without traversing the tree again
+    gets = nodes['a'].gets
+    nodes['a'].gets = None
+    nodes['c'].contents['hardness'] = 310
+    refresh(roots, ops)
+    assert nodes['a'].contents['total'] == 630
+    assert nodes['e'].contents['total'] == 630
+    # a new node is collected by a full traversal
+    nodes['a'].gets = gets
+    nodes['e'].add_child(Sample(name='f', hardness=10))
+    refresh(roots, ops)
+    assert nodes['a'].contents['total'] == 640
+    # a hidden node does not change the result
+    nodes['b'].readable(False)
+    ops[0](roots[0])
+    refresh(roots, ops)
+    del calls[:]
+    nodes['c'].contents['hardness'] = 0
+    refresh(roots, ops)
+    assert calls == []
+
+
+def test_refresh_write_barrier(operations):
+    _, ops = operations
+    roots, nodes = make_forest()
+    nodes['b'].writeable(False)
+    refresh(roots, ops)
+    assert 'total' not in nodes['c'].contents
+    nodes['b'].contents['total'] = 1
+    refresh(roots, [propagate('total', overwrite=True)])
+    assert 'total' not in nodes['c'].contents
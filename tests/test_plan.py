@@ -0,0 +1,71 @@
+from karon import Sample
+from karon.operations import aggregate, propagate
+from karon.plan import Plan
+from karon.tree import PreorderTree
+
+
+def make_forest():
+    #   a          x
+    #   b  e       y
+    #  c d
+    nodes = {name: Sample(name=name) for name in 'abcdexy'}
+    nodes['a'].add_child(nodes['b'])
+    nodes['a'].add_child(nodes['e'])
+    nodes['b'].add_child(nodes['c'])
+    nodes['b'].add_child(nodes['d'])
+    nodes['x'].add_child(nodes['y'])
+    for name, hv, width in (('c', 300, 1), ('d', 320, 2), ('y', 280, 3)):
+        nodes[name].contents['hardness'] = hv
+        nodes[name].contents['width'] = width
+    return [nodes['a'], nodes['x']], nodes
+
+
+def snapshot(roots):
+    return [dict(n.contents) for root in roots for n in PreorderTree(root)]
+
+
+def test_plan_merges_passes():
+    plan = Plan()
+    for key in ('hardness', 'width'):
+        plan.aggregate(key, reduce=max, target=f"max {key}")
+        plan.propagate(f"max {key}")
+    passes = plan.compile()
+    assert [(p.kind, len(p.operations)) for p in passes] == \
+        [('gets', 2), ('puts', 2)]
+    explanation = plan.explain()
+    assert "4 operations in 2 passes" in explanation
+    assert "propagate('max width' -> 'max width')" in explanation
+
+
+def test_plan_orders_dependencies():
+    plan = Plan(propagate('hardness'),
+                aggregate('hardness', reduce=lambda n, v: None),
+                aggregate('width', reduce=lambda n, v: None,
+                          target='hardness'))
+    passes = plan.compile()
+    assert [(p.kind, len(p.operations)) for p in passes] == \
+        [('puts', 1), ('gets', 1), ('gets', 1)]
+
+
+def test_plan_matches_sequential():
+    def maximum(key):
+        def func(node, values):
+            values = [v for v in values if v is not None]
+            if values:
+                node.contents[f"max {key}"] = max(values)
+        return func
+
+    operations = []
+    for key in ('hardness', 'width'):
+        operations.append(aggregate(key, reduce=maximum(key),
+                                    target=f"max {key}"))
+        operations.append(propagate(f"max {key}", overwrite=True))
+    expected, _ = make_forest()
+    for op in operations:
+        for root in expected:
+            op(root)
+    actual, nodes = make_forest()
+    Plan(*operations)(actual)
+    assert snapshot(actual) == snapshot(expected)
+    assert nodes['c'].contents['max hardness'] == 320
+    assert nodes['y'].contents['max width'] == 3
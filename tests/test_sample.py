@@ -22,3 +22,18 @@ def test_sample():
     assert not immutable.readable() and not immutable.writeable()
     for k, v in iter(package.items()):
         assert immutable.contents[k] == v
+
+
+def test_contents_assignment():
+    from karon.sample import Contents
+    sample = Sample()
+    attributes = {'foo': 'bar'}
+    sample.contents = attributes
+    # plain dicts are copied...
+    attributes['foo'] = 'baz'
+    assert sample.contents == {'foo': 'bar'}
+    assert isinstance(sample.contents, Contents)
+    # ...Contents are kept
+    contents = Contents(foo='baz')
+    sample.contents = contents
+    assert sample.contents is contents
@@ -0,0 +1,19 @@
+from karon.schema import Schema
+
+
+def test_schema():
+    name = "Weld Main Stage Data: Heat Wirefeed Speed (mm/s)"
+    schema = Schema(["name"])
+    key = schema.intern(''.join(list(name)))
+    assert key == name
+    assert schema.intern(''.join(list(name))) is key
+    assert schema.id(key) == 1
+    assert schema.name(1) is key
+    assert schema.id("other") == 2
+    assert 7 not in schema
+    assert schema.id(7) == 3 and schema.name(3) == 7
+    derived = schema.derived("max {}", key)
+    assert derived == f"max {name}"
+    assert schema.derived("max {}", name) is derived
+    assert derived in schema
+    assert list(schema) == ["name", name, "other", 7, derived]
@@ -0,0 +1,142 @@
+import pytest
+from karon import Sample
+from karon.decorators import readwrite
+from karon.io import ExcelIO
+from karon.store import ForestStore
+from karon.tree import PreorderTree
+from karon.tree.build import from_parent
+
+
+@pytest.fixture
+def forest():
+    @readwrite
+    def generic(**contents):
+        return Sample(**contents)
+
+    nodes = ExcelIO(default=generic).load('data/example.xlsx')
+    nodes = [n for n in nodes if isinstance(n.contents['name'], str)]
+    for node in nodes:
+        if not isinstance(node.contents['parent name'], str):
+            node.contents['parent name'] = None
+    roots = from_parent(nodes, 'name', 'parent name')
+    nodes[0].contents['vector'] = (1, 2, 3)
+    nodes[1].contents['flag'] = True
+    nodes[-1].writeable(False)
+    return roots
+
+
+def test_add(forest):
+    with ForestStore() as store:
+        ids = store.add(forest)
+        expected = [n for r in forest for n in PreorderTree(r)]
+        assert len(store) == len(ids) == len(expected)
+        nodes = store.get(ids)
+        for lhs, rhs in zip(nodes, expected):
+            assert set(lhs.contents) == set(rhs.contents)
+            for k, v in rhs.contents.items():
+                w = lhs.contents[k]
+                assert (w != w and v != v) or w == v
+            assert lhs.writeable() == rhs.writeable()
+        flagged, = store.find({'flag': True})
+        assert flagged.contents['flag'] is True
+        vector, = store.find([('vector', '=', (1, 2, 3))])
+        assert vector.contents['vector'] == (1, 2, 3)
+        assert store.roots(ids=True) == [ids[expected.index(r)]
+                                         for r in forest]
+        # more trees, under an existing node
+        more = store.add([Sample(name='extra')], parent=ids[0])
+        assert store.parent(more[0]) == ids[0]
+        assert store.add([]) == []
+
+
+def test_queries(forest, tmp_path):
+    path = str(tmp_path / 'forest.db')
+    with ForestStore(path) as store:
+        store.add(forest)
+    # reopened
+    with ForestStore(path) as store:
+        for root in forest:
+            rid, = store.find({'name': root.contents['name']}, ids=True)
+            subtree = list(PreorderTree(root))[1:]
+            expected = sorted(
+                n.contents['name'] for n in subtree
+                if n.contents.get('modulus (GPa)', 0) > 120)
+            actual = store.descendants(rid, [('modulus (GPa)', '>', 120)])
+            assert sorted(n.contents['name'] for n in actual) == expected
+            assert len(store.descendants(rid, ids=True)) == len(subtree)
+            assert store.descendants(rid, inclusive=True,
+                                     ids=True)[0] == rid
+            # ancestors, nearest first
+            for node in subtree:
+                nid, = store.find({'name': node.contents['name']}, ids=True)
+                lineage = []
+                up = node.parent
+                while up is not None:
+                    lineage.append(up.contents['name'])
+                    up = up.parent
+                assert [n.contents['name'] for n in
+                        store.ancestors(nid)] == lineage
+        assert store.find({'unknown': 1}) == []
+        assert store.find([('name', 'LIKE', 'e%'),
+                           ('composition', '=', 'Ti90Al6V4')])
+        with pytest.raises(ValueError):
+            store.find([('name', '; DROP TABLE nodes; --', 1)])
+
+
+def test_filter_types():
+    nodes = [Sample(name='a', hardness=350), Sample(name='b', hardness='N/A'),
+             Sample(name='c', hardness=float('nan')),
+             Sample(name='d', hardness=250.5)]
+    with ForestStore() as store:
+        store.add(nodes)
+
+        def names(*where):
+            return [n.contents['name'] for n in store.find(list(where))]
+
+        # numbers are compared with numbers, strings with strings
+        assert names(('hardness', '>', 300)) == ['a']
+        assert names(('hardness', '<', 300)) == ['d']
+        assert names(('hardness', '>', 'M')) == ['b']
+        # NaN equals NaN only
+        assert names(('hardness', '=', float('nan'))) == ['c']
+        assert names(('hardness', '!=', float('nan'))) == ['a', 'b', 'd']
+        assert names(('hardness', '>', float('nan'))) == []
+
+
+def test_add_rollback(tmp_path):
+    path = str(tmp_path / 'forest.db')
+    with ForestStore(path) as store:
+        with pytest.raises(OverflowError):
+            store.add([Sample(name='a', huge=2**70)])
+        assert len(store) == 0
+        store.add([Sample(name='b', huge=1)])
+    with ForestStore(path) as store:
+        assert [n.contents['name'] for n in store.find({'huge': 1})] == ['b']
+
+
+def test_dates(tmp_path):
+    import datetime
+    import pandas as pd
+    path = str(tmp_path / 'dates.xlsx')
+    pd.DataFrame({'name': ['a', 'b', 'c'],
+                  'printed': [pd.Timestamp('2020-01-01'),
+                              pd.Timestamp('2020-03-15 12:30'), pd.NaT]}
+                 ).to_excel(path, sheet_name='builds', index=False)
+    nodes = ExcelIO(default=Sample).load(path)
+    nodes.append(Sample(name='d', day=datetime.date(2021, 5, 6),
+                        at=datetime.time(8, 15)))
+    with ForestStore() as store:
+        store.add(nodes)
+        stored = store.find()
+        assert str([n.contents for n in stored]) == \
+            str([n.contents for n in nodes])
+        assert isinstance(stored[0].contents['printed'], pd.Timestamp)
+        assert stored[2].contents['printed'] is pd.NaT
+        # dates compare with dates
+        assert [n.contents['name'] for n in store.find(
+            [('printed', '>', pd.Timestamp('2020-02-01'))])] == ['b']
+        assert store.find({'day': datetime.date(2021, 5, 6)}, ids=True)
+        # values that cannot be read back are rejected
+        with pytest.raises(TypeError):
+            store.add([Sample(name='e', delay=pd.Timedelta('1h'))])
+        assert len(store) == len(nodes)